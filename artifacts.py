@@ -0,0 +1,112 @@
+"""Armazenamento dos vídeos entre os workers do modo distribuído
+
+Os jobs carregam a chave do vídeo no armazenamento (ex.: "job_3/temp_video_1.mp4"),
+não um caminho local, para os workers poderem rodar em máquinas diferentes:
+
+- DirectoryArtifactStore: uma pasta, local ou montada por todas as máquinas (NFS, SMB)
+- S3ArtifactStore: um bucket S3 ou compatível (MinIO, R2...), via boto3
+"""
+import os
+import shutil
+import tempfile
+
+class ArtifactStore:
+    def put(self, local_path, key):
+        """Guarda o arquivo local com a chave e o remove do disco local"""
+        raise NotImplementedError
+
+    def fetch(self, key):
+        """Caminho local com o conteúdo (pode ser uma cópia temporária; libere com release)"""
+        raise NotImplementedError
+
+    def release(self, key, local_path):
+        """Descarta a cópia local criada por fetch"""
+        pass
+
+    def move(self, key, new_key):
+        """Renomeia o arquivo no armazenamento"""
+        raise NotImplementedError
+
+    def exists(self, key):
+        raise NotImplementedError
+
+class DirectoryArtifactStore(ArtifactStore):
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def put(self, local_path, key):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.move(local_path, path)
+        return key
+
+    def fetch(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Vídeo não encontrado: {key}")
+        return path
+
+    def move(self, key, new_key):
+        os.replace(self.path(key), self.path(new_key))
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+class S3ArtifactStore(ArtifactStore):
+    def __init__(self, bucket, prefix="", endpoint_url=None):
+        import boto3
+
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.client = boto3.client('s3', endpoint_url=endpoint_url)
+
+    def _object(self, key):
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put(self, local_path, key):
+        self.client.upload_file(local_path, self.bucket, self._object(key))
+        os.remove(local_path)
+        return key
+
+    def fetch(self, key):
+        fd, local_path = tempfile.mkstemp(suffix=os.path.splitext(key)[1])
+        os.close(fd)
+        try:
+            self.client.download_file(self.bucket, self._object(key), local_path)
+        except Exception:
+            os.remove(local_path)
+            raise
+        return local_path
+
+    def release(self, key, local_path):
+        if os.path.exists(local_path):
+            os.remove(local_path)
+
+    def move(self, key, new_key):
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=self._object(new_key),
+            CopySource={'Bucket': self.bucket, 'Key': self._object(key)}
+        )
+        self.client.delete_object(Bucket=self.bucket, Key=self._object(key))
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object(key))
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+def open_artifact_store(location):
+    """s3://bucket/prefixo usa o S3 (endpoint opcional em S3_ENDPOINT_URL); outro valor é uma pasta"""
+    if location.startswith('s3://'):
+        bucket, _, prefix = location[len('s3://'):].partition('/')
+        return S3ArtifactStore(bucket, prefix, endpoint_url=os.environ.get("S3_ENDPOINT_URL"))
+    return DirectoryArtifactStore(location)
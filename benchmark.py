@@ -0,0 +1,628 @@
+"""Benchmark offline do pipeline completo (Temu -> Gemini -> YouTube)
+
+Sobe um servidor HTTP local que faz o papel da página de produtos do Temu,
+dos vídeos MP4, da API do Gemini e do upload resumable do YouTube, e roda
+VideoExtractor e YouTubeShortsUploader contra ele. O servidor roda em outro
+processo (--serve), para o pico de memória medido ser só o do pipeline.
+
+Uso:
+    python benchmark.py --videos 20 --gemini-latency 0.3 --gemini-429-rate 0.1 --output bench.json
+    python benchmark.py --compare bench_anterior.json
+    python benchmark.py --analysis-mode contact_sheet --compare bench_frames.json
+    python benchmark.py --faststart --download-bandwidth 2e6 --compare bench.json
+    python benchmark.py --startup
+"""
+import argparse
+import base64
+import io
+import json
+import math
+import os
+import random
+import re
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from metrics import registry
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def estimate_image_tokens(data):
+    """Estimativa de tokens de uma imagem no Gemini (258 por bloco de 768x768)"""
+    from PIL import Image
+
+    width, height = Image.open(io.BytesIO(base64.b64decode(data))).size
+    if max(width, height) <= 384:
+        return 258
+    return 258 * math.ceil(width / 768) * math.ceil(height / 768)
+
+def make_synthetic_mp4(path, seconds=3, fps=24, size=(720, 1280)):
+    """Gera um MP4 sintético (gradiente em movimento) para os testes"""
+    import cv2
+    import numpy as np
+
+    width, height = size
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    for i in range(seconds * fps):
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[..., 0] = (x + i * 4) % 256
+        frame[..., 1] = (y + i * 2) % 256
+        frame[..., 2] = (x[None, :] + y + i) % 256
+        writer.write(frame)
+    writer.release()
+
+    with open(path, 'rb') as f:
+        return f.read()
+
+CONTAINER_BOXES = (b'moov', b'trak', b'mdia', b'minf', b'stbl', b'edts', b'udta')
+
+def _iter_boxes(data, start=0, end=None):
+    """Percorre os boxes MP4 de data[start:end] retornando (tipo, início, fim)"""
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack('>I4s', data[offset:offset + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', data[offset + 8:offset + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        yield box_type, offset, offset + size, header
+        offset += size
+
+def _shift_chunk_offsets(moov, delta):
+    """Soma delta às tabelas stco/co64 dentro do moov"""
+    def walk(start, end):
+        for box_type, box_start, box_end, header in _iter_boxes(moov, start, end):
+            body = box_start + header
+            if box_type in CONTAINER_BOXES:
+                walk(body, box_end)
+            elif box_type in (b'stco', b'co64'):
+                count = struct.unpack('>I', moov[body + 4:body + 8])[0]
+                fmt, width = ('>I', 4) if box_type == b'stco' else ('>Q', 8)
+                for i in range(count):
+                    pos = body + 8 + i * width
+                    moov[pos:pos + width] = struct.pack(fmt, struct.unpack(fmt, moov[pos:pos + width])[0] + delta)
+    walk(0, len(moov))
+
+def make_faststart(data):
+    """Move o moov para antes do mdat (como o qt-faststart), ajustando os offsets"""
+    boxes = list(_iter_boxes(data))
+    types = [box[0] for box in boxes]
+    if b'moov' not in types or b'mdat' not in types or types.index(b'moov') < types.index(b'mdat'):
+        return data
+
+    moov_box = boxes[types.index(b'moov')]
+    moov = bytearray(data[moov_box[1]:moov_box[2]])
+    _shift_chunk_offsets(moov, len(moov))
+
+    output = bytearray()
+    for box_type, start, end, header in boxes:
+        if box_type == b'moov':
+            continue
+        if box_type == b'mdat':
+            output += moov
+        output += data[start:end]
+    return bytes(output)
+
+def video_variant(video_bytes, index):
+    """Mesmo vídeo com um box 'free' final diferente por índice, para o SHA-256 não se repetir"""
+    payload = f"benchmark-video-{index}".encode('ascii')
+    return video_bytes + struct.pack('>I4s', 8 + len(payload), b'free') + payload
+
+class StubServer:
+    """Servidor local com as rotas do Temu, Gemini e YouTube usadas pelo pipeline"""
+
+    def __init__(self, video_bytes, num_videos, gemini_latency=0.0, gemini_429_rate=0.0,
+                 upload_latency=0.0, download_bandwidth=0.0, seed=0):
+        self.video_bytes = video_bytes
+        self.num_videos = num_videos
+        self.download_bandwidth = download_bandwidth  # bytes/s dos vídeos; 0 = sem limite
+        self.gemini_latency = gemini_latency
+        self.gemini_429_rate = gemini_429_rate
+        self.upload_latency = upload_latency
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'gemini_requests': 0, 'gemini_429': 0, 'uploads': 0, 'video_downloads': 0,
+                      'not_found': 0}
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+            return self.stats[key]
+
+    def page_html(self):
+        """Página de produtos com vídeos em tags <video> e em JSON nos scripts"""
+        items = []
+        scripts = []
+        for i in range(1, self.num_videos + 1):
+            url = f"{self.base_url}/videos/goods-vod/{i}.mp4"
+            items.append(
+                f'<div class="product"><h2 class="product-title">Produto {i}</h2>'
+                f'<span class="product-price">R$ {i},99</span><video src="{url}"></video></div>'
+            )
+            scripts.append(json.dumps({'videoUrl': url, 'goodsId': i}))
+        return (
+            "<html><head><title>Temu</title></head><body>"
+            + ''.join(items)
+            + ''.join(f"<script>window.__data = {s};</script>" for s in scripts)
+            + "</body></html>"
+        )
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body=b'', content_type='application/json', headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_video(self, body):
+                """Envia o MP4 limitado a download_bandwidth, como um CDN remoto"""
+                if not server.download_bandwidth:
+                    self._send(200, body, 'video/mp4')
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'video/mp4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                chunk_size = 64 * 1024
+                for offset in range(0, len(body), chunk_size):
+                    chunk = body[offset:offset + chunk_size]
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
+                    time.sleep(len(chunk) / server.download_bandwidth)
+
+            def _read_body(self):
+                length = int(self.headers.get('Content-Length', 0))
+                return self.rfile.read(length) if length else b''
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                # Só os vídeos da página existem: URLs truncadas encontradas
+                # pelo extrator recebem 404, como no CDN real
+                video = re.fullmatch(r'/videos/goods-vod/(\d+)\.mp4', path)
+                if path.startswith('/page'):
+                    self._send(200, server.page_html().encode('utf-8'), 'text/html; charset=utf-8')
+                elif video and 1 <= int(video.group(1)) <= server.num_videos:
+                    server._count('video_downloads')
+                    self._send_video(video_variant(server.video_bytes, video.group(1)))
+                elif path == '/__stats':
+                    with server.lock:
+                        stats = dict(server.stats, peak_rss_mb=peak_rss_mb())
+                    self._send(200, json.dumps(stats).encode('utf-8'))
+                else:
+                    server._count('not_found')
+                    self._send(404, b'{}')
+
+            def do_POST(self):
+                parsed = urlparse(self.path)
+                request_body = self._read_body()
+
+                if parsed.path.endswith(':generateContent'):
+                    n = server._count('gemini_requests')
+                    time.sleep(server.gemini_latency)
+                    with server.lock:
+                        rejected = server.random.random() < server.gemini_429_rate
+                    if rejected:
+                        server._count('gemini_429')
+                        body = {'error': {'code': 429, 'status': 'RESOURCE_EXHAUSTED'}}
+                        self._send(429, json.dumps(body).encode('utf-8'))
+                        return
+                    parts = json.loads(request_body)['contents'][0]['parts']
+                    tokens = sum(
+                        estimate_image_tokens(part['inlineData']['data']) if 'inlineData' in part
+                        else len(part.get('text', '')) // 4
+                        for part in parts
+                    )
+                    body = {
+                        'candidates': [{'content': {'parts': [{'text': f'Produto de teste {n}'}]}}],
+                        'usageMetadata': {'promptTokenCount': tokens}
+                    }
+                    self._send(200, json.dumps(body).encode('utf-8'))
+
+                elif '/upload/' in parsed.path and 'resumable' in parse_qs(parsed.query).get('uploadType', []):
+                    upload_id = server._count('uploads')
+                    location = f"{server.base_url}/upload/youtube/v3/videos?uploadType=resumable&upload_id={upload_id}"
+                    self._send(200, b'', headers={'Location': location})
+
+                else:
+                    self._send(404, b'{}')
+
+            def do_PUT(self):
+                parsed = urlparse(self.path)
+                self._read_body()
+                if '/upload/' in parsed.path:
+                    time.sleep(server.upload_latency)
+                    upload_id = parse_qs(parsed.query).get('upload_id', ['0'])[0]
+                    body = {'kind': 'youtube#video', 'id': f'bench{upload_id}'}
+                    self._send(200, json.dumps(body).encode('utf-8'))
+                else:
+                    self._send(404, b'{}')
+
+        return Handler
+
+def serve(args):
+    """Modo --serve: gera o MP4 e roda só o servidor stub, até o stdin ser fechado"""
+    with tempfile.TemporaryDirectory(prefix="shorts_stub_") as workdir:
+        video_bytes = make_synthetic_mp4(os.path.join(workdir, "fixture.mp4"), seconds=args.video_seconds)
+        if args.faststart:
+            video_bytes = make_faststart(video_bytes)
+        server = StubServer(
+            video_bytes,
+            args.videos,
+            gemini_latency=args.gemini_latency,
+            gemini_429_rate=args.gemini_429_rate,
+            upload_latency=args.upload_latency,
+            download_bandwidth=args.download_bandwidth,
+            seed=args.seed
+        ).start()
+        print(server.base_url, flush=True)
+        sys.stdin.read()
+        server.stop()
+
+class StubProcess:
+    """StubServer em um subprocesso, fora da memória medida do pipeline"""
+
+    def __init__(self, args):
+        argv = [
+            sys.executable, os.path.abspath(__file__), '--serve',
+            '--videos', str(args.videos),
+            '--video-seconds', str(args.video_seconds),
+            '--gemini-latency', str(args.gemini_latency),
+            '--gemini-429-rate', str(args.gemini_429_rate),
+            '--upload-latency', str(args.upload_latency),
+            '--download-bandwidth', str(args.download_bandwidth),
+            '--seed', str(args.seed)
+        ]
+        if args.faststart:
+            argv.append('--faststart')
+        self.process = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        self.base_url = self.process.stdout.readline().strip()
+        if not self.base_url:
+            self.process.kill()
+            raise RuntimeError("O servidor stub não iniciou")
+
+    def stats(self):
+        with urllib.request.urlopen(f"{self.base_url}/__stats", timeout=30) as response:
+            return json.load(response)
+
+    def stop(self):
+        self.process.stdin.close()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+class FixtureDriver:
+    """Substitui o Chrome, carregando a página fixture via HTTP"""
+
+    def __init__(self):
+        self.html = ''
+        self.pending_logs = []
+
+    def get(self, url):
+        import requests
+
+        self.html = requests.get(url, timeout=30).text
+        # Simula as requisições de vídeo feitas pelo navegador ao carregar a página
+        self.pending_logs = [
+            {'message': json.dumps({'message': {
+                'method': 'Network.requestWillBeSent',
+                'params': {'request': {'url': src}}
+            }})}
+            for src in re.findall(r'<video src="([^"]+)"', self.html)
+        ]
+
+    def get_log(self, log_type):
+        logs, self.pending_logs = self.pending_logs, []
+        return logs
+
+    def execute_script(self, script, *args):
+        if 'getElementsByTagName' in script:
+            return re.findall(r'<script>(.*?)</script>', self.html, re.DOTALL)
+        if 'getEntriesByType' in script:
+            return re.findall(r'<video src="([^"]+)"', self.html)
+        if 'return document.body.scrollHeight' in script:
+            return 1000
+        return None
+
+    def quit(self):
+        pass
+
+def peak_rss_mb():
+    """Pico de memória residente do processo em MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+def stage_latencies():
+    """p50/p95 de cada etapa medida pelo registro de métricas"""
+    stages = {}
+    for histogram in registry.to_dict()['histograms']:
+        if histogram['name'].endswith('_seconds') and not histogram['labels']:
+            stages[histogram['name'][:-len('_seconds')]] = {
+                'count': histogram['count'],
+                'p50': histogram['p50'],
+                'p95': histogram['p95']
+            }
+    return stages
+
+def time_to_title():
+    """p50/p95 do tempo entre o início do download e o título pronto"""
+    histogram = registry.histogram("time_to_title_seconds")
+    if histogram is None:
+        return None
+    return {
+        'count': histogram.count,
+        'p50': histogram.percentile(50),
+        'p95': histogram.percentile(95),
+        'streaming': registry.histogram("extract_frames_partial_seconds") is not None
+    }
+
+def gemini_payload(mode, videos):
+    """Bytes, imagens e tokens enviados ao Gemini por vídeo"""
+    if not videos:
+        return None
+    return {
+        'mode': mode,
+        'payload_bytes_per_video': round(registry.counter("gemini_payload_bytes", mode=mode) / videos),
+        'images_per_video': round(registry.counter("gemini_images", mode=mode) / videos, 2),
+        'prompt_tokens_per_video': round(registry.counter("gemini_prompt_tokens", mode=mode) / videos)
+    }
+
+def run_extract(server, output_folder, use_browser=False, analysis_mode="frames"):
+    from temu_video_extractor import VideoAnalyzer, VideoExtractor
+
+    extractor = VideoExtractor("benchmark")
+    extractor.analyzer = VideoAnalyzer("benchmark", api_base_url=server.base_url, analysis_mode=analysis_mode)
+    extractor.initial_wait = 0
+    extractor.scroll_pause = 0
+    extractor.network_monitor_seconds = 0
+    extractor.output_folder = output_folder
+    extractor.wait_before_close = False
+    if not use_browser:
+        extractor.setup_driver = registry.timed("setup_driver")(FixtureDriver)
+
+    start = time.perf_counter()
+    files = extractor.process_page(f"{server.base_url}/page/produtos.html")
+    elapsed = time.perf_counter() - start
+    return {
+        'videos': len(files),
+        'seconds': round(elapsed, 3),
+        'videos_per_minute': round(len(files) / elapsed * 60, 2) if elapsed else None
+    }
+
+def run_upload(server, output_folder):
+    import httplib2
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.discovery_cache import get_static_doc
+    from youtube_shorts_uploader import YouTubeShortsUploader, CredentialManager
+
+    # Aponta rootUrl/baseUrl para o servidor local: assim tanto a API JSON
+    # quanto o upload resumable (/upload/...) vão para o stub
+    discovery = json.loads(get_static_doc("youtube", "v3"))
+    discovery['rootUrl'] = f"{server.base_url}/"
+    discovery['mtlsRootUrl'] = f"{server.base_url}/"
+    discovery['baseUrl'] = f"{server.base_url}/{discovery['servicePath']}"
+
+    manager = CredentialManager("client_secrets.json", ["https://www.googleapis.com/auth/youtube.upload"])
+    uploader = YouTubeShortsUploader("client_secrets.json", "benchmark", manager=manager)
+    uploader.youtube = build_from_document(discovery, http=httplib2.Http())
+
+    start = time.perf_counter()
+    video_ids = uploader.upload_directory(output_folder, delay_minutes=0) or []
+    elapsed = time.perf_counter() - start
+    return {
+        'videos': len(video_ids),
+        'seconds': round(elapsed, 3),
+        'videos_per_minute': round(len(video_ids) / elapsed * 60, 2) if elapsed else None
+    }
+
+# Dependências que não deveriam ser carregadas por comandos leves da CLI
+HEAVY_MODULES = (
+    'undetected_chromedriver', 'selenium', 'cv2', 'numpy', 'PIL',
+    'googleapiclient', 'google_auth_oauthlib', 'requests'
+)
+
+STARTUP_SNIPPET = """
+import contextlib, io, json, sys
+sys.path.insert(0, {root!r})
+import cli
+with contextlib.redirect_stdout(io.StringIO()):
+    cli.main({argv!r})
+print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))
+"""
+
+def measure_startup(runs=10):
+    """Tempo de inicialização da CLI e módulos pesados carregados por comando"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    cli_path = os.path.join(root, 'cli.py')
+    results = {}
+
+    for argv in (['--help'], ['status']):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, cli_path] + argv, capture_output=True, check=False)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        results[' '.join(argv)] = {
+            'median_ms': round(timings[len(timings) // 2] * 1000, 1),
+            'min_ms': round(timings[0] * 1000, 1)
+        }
+
+    # Mesmo processo do interpretador vazio, para descontar o custo do Python
+    baseline = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=False)
+        baseline.append(time.perf_counter() - start)
+    baseline.sort()
+    results['python_baseline'] = {'median_ms': round(baseline[len(baseline) // 2] * 1000, 1)}
+
+    snippet = STARTUP_SNIPPET.format(root=root, argv=['status'], heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', snippet], capture_output=True, text=True, check=False)
+    lines = output.stdout.strip().splitlines()
+    results['status_heavy_imports'] = json.loads(lines[-1]) if lines else None
+
+    return results
+
+def compare(current, previous):
+    """Mostra a diferença entre duas execuções do benchmark"""
+    def delta(new, old):
+        if new is None or old is None or old == 0:
+            return 'n/a'
+        return f"{(new - old) / old * 100:+.1f}%"
+
+    print(f"\nComparação com {previous.get('commit')} ({previous.get('timestamp')}):")
+    for phase in ('extract', 'upload'):
+        new = current[phase]['videos_per_minute']
+        old = previous.get(phase, {}).get('videos_per_minute')
+        print(f"  {phase} vídeos/min: {old} -> {new} ({delta(new, old)})")
+    for stage, values in sorted(current['stages'].items()):
+        old = previous.get('stages', {}).get(stage, {}).get('p95')
+        print(f"  {stage} p95: {old} -> {values['p95']} ({delta(values['p95'], old)})")
+    for key in ('p50', 'p95'):
+        new = (current.get('time_to_title') or {}).get(key)
+        old = (previous.get('time_to_title') or {}).get(key)
+        print(f"  time_to_title {key}: {old} -> {new} ({delta(new, old)})")
+    for key in ('payload_bytes_per_video', 'prompt_tokens_per_video'):
+        new = (current.get('gemini') or {}).get(key)
+        old = (previous.get('gemini') or {}).get(key)
+        print(f"  gemini {key}: {old} -> {new} ({delta(new, old)})")
+    print(f"  pico RSS MB: {previous.get('peak_rss_mb')} -> {current['peak_rss_mb']} "
+          f"({delta(current['peak_rss_mb'], previous.get('peak_rss_mb'))})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline do extrator e do uploader")
+    parser.add_argument('--videos', type=int, default=10, help="Quantidade de vídeos na página fixture")
+    parser.add_argument('--video-seconds', type=int, default=3, help="Duração do MP4 sintético")
+    parser.add_argument('--faststart', action='store_true',
+                        help="Serve o MP4 com o moov no início (exercita a análise durante o download)")
+    parser.add_argument('--gemini-latency', type=float, default=0.2, help="Latência do Gemini falso (s)")
+    parser.add_argument('--gemini-429-rate', type=float, default=0.0, help="Fração de respostas 429 do Gemini")
+    parser.add_argument('--upload-latency', type=float, default=0.0, help="Latência do upload falso (s)")
+    parser.add_argument('--download-bandwidth', type=float, default=0.0,
+                        help="Vazão dos downloads de vídeo em bytes/s (ex.: 2e6); 0 = sem limite")
+    parser.add_argument('--analysis-mode', choices=['frames', 'contact_sheet'], default='frames',
+                        help="Modo de análise do Gemini")
+    parser.add_argument('--browser', action='store_true', help="Usa o Chrome real em vez do FixtureDriver")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--startup', action='store_true',
+                        help="Mede só o tempo de inicialização da CLI (cli.py)")
+    parser.add_argument('--output', help="Salva o resultado em JSON")
+    parser.add_argument('--compare', help="Resultado JSON anterior para comparar")
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    if args.startup:
+        result = {'commit': git_commit(), 'startup': measure_startup()}
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+        return
+
+    registry.reset()
+    original_dir = os.getcwd()
+
+    with tempfile.TemporaryDirectory(prefix="shorts_bench_") as workdir:
+        server = StubProcess(args)
+
+        # Roda dentro do diretório temporário para não sujar uploads_log.json
+        os.chdir(workdir)
+        try:
+            output_folder = os.path.join(workdir, "videos")
+            extract = run_extract(server, output_folder, use_browser=args.browser,
+                                  analysis_mode=args.analysis_mode)
+            upload = run_upload(server, output_folder)
+            server_stats = server.stats()
+        finally:
+            os.chdir(original_dir)
+            server.stop()
+
+    result = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'config': vars(args),
+        'extract': extract,
+        'upload': upload,
+        'stages': stage_latencies(),
+        'gemini': gemini_payload(args.analysis_mode, extract['videos']),
+        'time_to_title': time_to_title(),
+        'server': server_stats,
+        # Só o processo do pipeline; o do servidor stub está em server.peak_rss_mb
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+    print("\n=== Resultado do benchmark ===")
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(result, json.load(f))
+
+    # Um stand-in quebrado não pode passar como resultado válido
+    if extract['videos'] != args.videos or upload['videos'] != extract['videos']:
+        print(f"\nERRO: {args.videos} vídeo(s) na página, {extract['videos']} extraído(s), "
+              f"{upload['videos']} enviado(s)", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""CLI não interativa para o extrator e o uploader
+
+Cada subcomando importa apenas as dependências de que precisa: `status` não
+carrega Selenium, OpenCV nem o cliente do Google, e `analyze` não carrega o
+Selenium. O resultado sai em JSON no stdout; os logs vão para o stderr.
+
+Uso:
+    python cli.py crawl https://www.temu.com/... [--output videos_temu] [--analysis-mode contact_sheet]
+    python cli.py analyze videos_temu/temp_video_1.mp4 [--rename]
+    python cli.py upload --channel canal1 [--dir videos_temu | arquivos.mp4 ...] [--publish]
+    python cli.py status
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+from metrics import registry, set_log_stream
+
+def cmd_crawl(args):
+    from temu_video_extractor import VideoAnalyzer, VideoExtractor
+
+    extractor = VideoExtractor(args.api_key)
+    extractor.analyzer = VideoAnalyzer(args.api_key, analysis_mode=args.analysis_mode)
+    extractor.output_folder = args.output
+    extractor.wait_before_close = False
+
+    files = extractor.process_page(args.url)
+    return {'url': args.url, 'files': files}, bool(files)
+
+def cmd_analyze(args):
+    from temu_video_extractor import VideoAnalyzer, VideoExtractor
+
+    extractor = VideoExtractor(args.api_key)
+    extractor.analyzer = VideoAnalyzer(args.api_key, analysis_mode=args.analysis_mode)
+
+    results = []
+    for i, video_path in enumerate(args.videos, 1):
+        if not os.path.exists(video_path):
+            results.append({'video_path': video_path, 'title': None, 'error': 'arquivo não encontrado'})
+            continue
+
+        title = extractor.analyzer.analyze_file(video_path)
+        entry = {'video_path': video_path, 'title': title}
+        if args.rename:
+            output_folder = os.path.dirname(video_path) or '.'
+            entry['renamed_to'] = extractor.finalize_video(video_path, output_folder, i, title)
+        results.append(entry)
+
+    return {'videos': results}, all(r['title'] for r in results)
+
+def cmd_upload(args):
+    from youtube_shorts_uploader import AuthorizationRequired, YouTubeShortsUploader
+
+    # Nunca abre o navegador: o canal precisa ter sido autorizado antes
+    uploader = YouTubeShortsUploader(args.client_secrets, args.channel, interactive=False)
+    try:
+        uploader.authenticate()
+    except AuthorizationRequired as e:
+        return {'channel': args.channel, 'error': str(e)}, False
+
+    if args.videos:
+        uploads = []
+        for i, video_path in enumerate(args.videos):
+            if i and uploads[-1]['video_id']:
+                time.sleep(args.delay_minutes * 60)
+            uploads.append({'video_path': video_path, 'video_id': uploader.upload_video(video_path)})
+        video_ids = [u['video_id'] for u in uploads if u['video_id']]
+        ok = len(video_ids) == len(uploads)
+    else:
+        video_ids = uploader.upload_directory(args.dir, delay_minutes=args.delay_minutes) or []
+        uploads = [{'video_id': video_id} for video_id in video_ids]
+        ok = bool(video_ids)
+
+    result = {'channel': args.channel, 'uploads': uploads, 'quota_used': uploader.quota_used}
+    if args.publish and video_ids:
+        batch = uploader.publish_videos(video_ids)
+        result['published'] = [video_id for video_id, r in batch.items() if r['ok']]
+        ok = ok and len(result['published']) == len(video_ids)
+
+    return result, ok
+
+def cmd_status(args):
+    from youtube_shorts_uploader import CredentialManager
+
+    status = {'channels': CredentialManager.list_channels()}
+
+    if os.path.isdir(args.videos_dir):
+        status['pending_videos'] = len([f for f in os.listdir(args.videos_dir) if f.endswith('.mp4')])
+
+    if os.path.exists(args.uploads_log):
+        with open(args.uploads_log, 'r', encoding='utf-8') as f:
+            try:
+                logs = json.load(f)
+            except ValueError:
+                logs = []
+        status['uploads'] = len(logs)
+        status['last_upload'] = logs[-1] if logs else None
+
+    if args.db.startswith(('redis://', 'rediss://')) or os.path.exists(args.db):
+        from work_queue import open_queue
+
+        status['queues'] = open_queue(args.db).stats()
+
+    return status, True
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Extrator do Temu e uploader de YouTube Shorts")
+    parser.add_argument('--metrics', help="Salva as métricas em <prefixo>.json e <prefixo>.prom")
+    parser.add_argument('--json-logs', action='store_true', help="Logs em JSON no stderr")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    api_key = os.environ.get("GEMINI_API_KEY", "")
+
+    crawl = subparsers.add_parser('crawl', help="Extrai, baixa e analisa os vídeos de uma página do Temu")
+    crawl.add_argument('url')
+    crawl.add_argument('--output', default="videos_temu")
+    crawl.add_argument('--api-key', default=api_key, help="Chave do Gemini (padrão: GEMINI_API_KEY)")
+    crawl.add_argument('--analysis-mode', choices=['frames', 'contact_sheet'], default='frames')
+    crawl.set_defaults(func=cmd_crawl)
+
+    analyze = subparsers.add_parser('analyze', help="Gera títulos para vídeos já baixados")
+    analyze.add_argument('videos', nargs='+')
+    analyze.add_argument('--rename', action='store_true', help="Renomeia os arquivos com o título")
+    analyze.add_argument('--api-key', default=api_key, help="Chave do Gemini (padrão: GEMINI_API_KEY)")
+    analyze.add_argument('--analysis-mode', choices=['frames', 'contact_sheet'], default='frames')
+    analyze.set_defaults(func=cmd_analyze)
+
+    upload = subparsers.add_parser('upload', help="Envia vídeos para um canal")
+    upload.add_argument('videos', nargs='*', help="Arquivos a enviar (padrão: todos de --dir)")
+    upload.add_argument('--channel', required=True)
+    upload.add_argument('--dir', default="videos_temu")
+    upload.add_argument('--client-secrets', default="client_secrets.json")
+    upload.add_argument('--delay-minutes', type=int, default=1, help="Intervalo entre uploads")
+    upload.add_argument('--publish', action='store_true', help="Publica os vídeos enviados ao final")
+    upload.set_defaults(func=cmd_upload)
+
+    status = subparsers.add_parser('status', help="Mostra canais, vídeos pendentes, uploads e filas")
+    status.add_argument('--videos-dir', default="videos_temu")
+    status.add_argument('--uploads-log', default="uploads_log.json")
+    status.add_argument('--db', default="jobs.db", help="Fila do worker.py: arquivo SQLite ou redis://...")
+    status.set_defaults(func=cmd_status)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # O stdout fica reservado para o JSON do resultado
+    set_log_stream(sys.stderr, json_output=args.json_logs)
+    with contextlib.redirect_stdout(sys.stderr):
+        result, ok = args.func(args)
+
+    if args.metrics:
+        registry.export(args.metrics)
+
+    print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+import bisect
+import collections
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Limites dos buckets (em segundos) usados por padrão nos histogramas
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Limites dos buckets (em bytes/s) para medidas de vazão
+THROUGHPUT_BUCKETS = (16e3, 64e3, 256e3, 1e6, 4e6, 16e6, 64e6, 256e6)
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS, max_samples=10000):
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max_samples = max_samples
+        # As amostras mais antigas saem sozinhas ao atingir max_samples
+        self.samples = collections.deque(maxlen=max_samples)
+
+    def observe(self, value):
+        """Registra uma observação"""
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += value
+        # Mantém as últimas amostras para calcular percentis exatos
+        self.samples.append(value)
+
+    def percentile(self, q):
+        """Percentil (0-100) das amostras recentes"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)
+        return ordered[index]
+
+    def to_dict(self):
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        buckets['+Inf'] = self.count
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'buckets': buckets
+        }
+
+class MetricsRegistry:
+    def __init__(self, namespace="shorts"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return (name, tuple(sorted(labels.items())))
+
+    def inc(self, name, value=1, **labels):
+        """Incrementa um contador"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, **labels):
+        """Registra um valor em um histograma"""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def histogram(self, name, **labels):
+        """Retorna o histograma registrado (ou None)"""
+        with self._lock:
+            return self._histograms.get(self._key(name, labels))
+
+    def counter(self, name, **labels):
+        """Retorna o valor atual de um contador"""
+        with self._lock:
+            return self._counters.get(self._key(name, labels), 0)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Mede a duração do bloco em segundos e conta erros"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc(f"{name}_errors", **labels)
+            raise
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - start, **labels)
+
+    def timed(self, name, **labels):
+        """Decorator equivalente a timer()"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        """Remove todas as métricas"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    @staticmethod
+    def _escape(value):
+        """Escapa o valor de um label como pede o formato texto do Prometheus"""
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    @classmethod
+    def _label_str(cls, labels, extra=None):
+        items = list(labels) + (list(extra.items()) if extra else [])
+        if not items:
+            return ''
+        return '{' + ','.join(f'{k}="{cls._escape(v)}"' for k, v in items) + '}'
+
+    def to_dict(self):
+        """Exporta as métricas como dict serializável em JSON"""
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                dict({'name': name, 'labels': dict(labels)}, **histogram.to_dict())
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+        return {'counters': counters, 'histograms': histograms}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """Exporta as métricas no formato texto do Prometheus"""
+        lines = []
+        data = self.to_dict()
+        typed = set()
+
+        for counter in data['counters']:
+            name = f"{self.namespace}_{counter['name']}_total"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{self._label_str(counter['labels'].items())} {counter['value']}")
+
+        for histogram in data['histograms']:
+            name = f"{self.namespace}_{histogram['name']}"
+            labels = histogram['labels'].items()
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            for bound, value in histogram['buckets'].items():
+                lines.append(f"{name}_bucket{self._label_str(labels, {'le': bound})} {value}")
+            lines.append(f"{name}_sum{self._label_str(labels)} {histogram['sum']}")
+            lines.append(f"{name}_count{self._label_str(labels)} {histogram['count']}")
+
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path_prefix):
+        """Salva as métricas em <prefixo>.json e <prefixo>.prom"""
+        with open(f"{path_prefix}.json", 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+        with open(f"{path_prefix}.prom", 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+
+class StructuredFormatter(logging.Formatter):
+    """Formata logs como texto legível ou JSON, incluindo campos extras"""
+
+    def __init__(self, json_output=False):
+        super().__init__()
+        self.json_output = json_output
+
+    def format(self, record):
+        fields = getattr(record, 'fields', {})
+        if self.json_output:
+            entry = {
+                'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+                'level': record.levelname,
+                'logger': record.name,
+                'message': record.getMessage()
+            }
+            entry.update(fields)
+            return json.dumps(entry, ensure_ascii=False, default=str)
+
+        message = record.getMessage()
+        if fields:
+            message += ' | ' + ' '.join(f"{k}={v}" for k, v in fields.items())
+        return message
+
+_handlers = []
+_log_stream = None
+_log_json = False
+
+def get_logger(name, json_output=None):
+    """Retorna um logger com saída estruturada no stdout
+
+    Sem json_output, usa o formato definido por set_log_stream().
+    """
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        handler = logging.StreamHandler(_log_stream or sys.stdout)
+        handler.setFormatter(StructuredFormatter(_log_json if json_output is None else json_output))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        _handlers.append(handler)
+    return logger
+
+def set_log_stream(stream, json_output=None):
+    """Redireciona os logs (ex.: para o stderr quando o stdout é JSON)
+
+    Vale para os loggers existentes e para os criados depois.
+    """
+    global _log_stream, _log_json
+    _log_stream = stream
+    if json_output is not None:
+        _log_json = json_output
+    for handler in _handlers:
+        handler.setStream(stream)
+        if json_output is not None:
+            handler.setFormatter(StructuredFormatter(json_output))
+
+def log_event(logger, message, level=logging.INFO, **fields):
+    """Registra uma mensagem com campos estruturados"""
+    logger.log(level, message, extra={'fields': fields})
+
+# Registro compartilhado pelas duas ferramentas
+registry = MetricsRegistry()
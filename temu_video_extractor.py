@@ -1,27 +1,64 @@
-import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 import json
+import logging
 import os
-import requests
 import time
 import re
+import hashlib
+import struct
+import threading
 from urllib.parse import urljoin, urlparse
-import cv2
 import base64
-import numpy as np
-from PIL import Image
 import io
+from metrics import registry, get_logger, log_event, THROUGHPUT_BUCKETS
+
+logger = get_logger("temu_video_extractor")
+
+class DownloadProgress:
+    """Acompanha quantos bytes de um download já estão no disco"""
+
+    def __init__(self, total_bytes):
+        self.total_bytes = total_bytes
+        self.bytes_written = 0
+        self.finished = False
+        self._condition = threading.Condition()
+
+    def update(self, bytes_written):
+        with self._condition:
+            self.bytes_written = bytes_written
+            self._condition.notify_all()
+
+    def finish(self):
+        with self._condition:
+            self.finished = True
+            self._condition.notify_all()
+
+    def wait_for(self, target_bytes):
+        """Bloqueia até target_bytes estarem no disco ou o download terminar"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.finished or self.bytes_written >= target_bytes)
+            return self.bytes_written >= target_bytes
 
 class VideoAnalyzer:
-    def __init__(self, api_key):
+    FRAMES_PROMPT = "Analise estas imagens de um produto e forneça um título curto e atraente que descreva o produto. Foque nas características principais e no uso do produto. Responda APENAS com o título, sem explicações adicionais."
+    
+    CONTACT_SHEET_PROMPT = "Esta imagem é uma grade com {count} frames do mesmo vídeo de um produto, em ordem cronológica (da esquerda para a direita, de cima para baixo). Use todos os quadros para entender o produto e forneça um título curto e atraente que o descreva. Foque nas características principais e no uso do produto. Responda APENAS com o título, sem explicações adicionais."
+    
+    def __init__(self, api_key, api_base_url="https://generativelanguage.googleapis.com",
+                 analysis_mode="frames", contact_sheet_frames=12, jpeg_quality=75):
         self.api_key = api_key
-        self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={api_key}"
+        self.api_url = f"{api_base_url}/v1beta/models/gemini-1.5-flash:generateContent?key={api_key}"
+        # "frames": uma imagem por frame; "contact_sheet": uma grade com vários frames
+        self.analysis_mode = analysis_mode
+        self.num_frames = contact_sheet_frames if analysis_mode == "contact_sheet" else 3
+        self.jpeg_quality = jpeg_quality
     
-    def extract_frames(self, video_path, num_frames=3):
+    @registry.timed("extract_frames")
+    def extract_frames(self, video_path, num_frames=None):
         """Extrai frames do vídeo para análise"""
+        # Importados aqui para o crawl e a CLI não carregarem o OpenCV
+        import cv2
+        
+        num_frames = num_frames or self.num_frames
         frames = []
         try:
             cap = cv2.VideoCapture(video_path)
@@ -43,12 +80,86 @@ class VideoAnalyzer:
             
             cap.release()
         except Exception as e:
-            print(f"Erro ao extrair frames: {str(e)}")
+            log_event(logger, "Erro ao extrair frames", level=logging.ERROR, video_path=video_path, error=str(e))
         
         return frames
     
+    @staticmethod
+    def probe_faststart(header):
+        """Verifica no início do arquivo se o atom moov vem antes do mdat
+        
+        Retorna (início, fim) do moov, False se o arquivo não é faststart
+        ou None se ainda não há bytes suficientes para decidir.
+        """
+        offset = 0
+        while offset + 8 <= len(header):
+            size, box_type = struct.unpack('>I4s', header[offset:offset + 8])
+            if size == 1:
+                # Tamanho estendido de 64 bits
+                if offset + 16 > len(header):
+                    return None
+                size = struct.unpack('>Q', header[offset + 8:offset + 16])[0]
+            elif size == 0:
+                # Box vai até o fim do arquivo
+                return False
+            
+            if box_type == b'moov':
+                return (offset, offset + size)
+            if box_type == b'mdat' or size < 8:
+                return False
+            offset += size
+        return None
+    
+    @registry.timed("extract_frames_partial")
+    def extract_frames_from_partial(self, video_path, progress, moov_end, num_frames=None):
+        """Extrai frames de um MP4 faststart enquanto ele ainda está sendo baixado
+        
+        Com o moov no início, os dados de mídia ficam aproximadamente em ordem
+        de tempo, então cada frame é lido assim que a parte correspondente do
+        arquivo chega ao disco.
+        """
+        import cv2
+        
+        num_frames = num_frames or self.num_frames
+        frames = []
+        cap = cv2.VideoCapture(video_path)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        
+        if total_frames == 0:
+            return frames
+        
+        media_bytes = progress.total_bytes - moov_end
+        margin = max(media_bytes // 20, 256 * 1024)
+        
+        for i in range(1, num_frames + 1):
+            pos = int(total_frames * i / (num_frames + 1))
+            target = moov_end + media_bytes * i // (num_frames + 1) + margin
+            
+            while True:
+                progress.wait_for(min(target, progress.total_bytes))
+                
+                # Reabre o arquivo para enxergar os bytes novos
+                cap = cv2.VideoCapture(video_path)
+                cap.set(cv2.CAP_PROP_POS_FRAMES, pos)
+                ret, frame = cap.read()
+                cap.release()
+                
+                if ret:
+                    frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                    break
+                if progress.finished:
+                    break
+                # Frame ainda incompleto, espera mais dados
+                target += margin
+        
+        return frames
+    
+    @registry.timed("encode_frame")
     def encode_frame(self, frame):
         """Converte frame para base64"""
+        from PIL import Image
+        
         try:
             # Converte numpy array para imagem PIL
             img = Image.fromarray(frame)
@@ -59,27 +170,73 @@ class VideoAnalyzer:
             
             # Converte para JPEG em memória
             buffer = io.BytesIO()
-            img.save(buffer, format="JPEG")
+            img.save(buffer, format="JPEG", quality=self.jpeg_quality)
             
             # Converte para base64
             return base64.b64encode(buffer.getvalue()).decode('utf-8')
         except Exception as e:
-            print(f"Erro ao codificar frame: {str(e)}")
+            log_event(logger, "Erro ao codificar frame", level=logging.ERROR, error=str(e))
             return None
     
+    def analyze_file(self, video_path):
+        """Extrai frames de um vídeo completo e gera o título"""
+        log_event(logger, "Analisando vídeo com IA", video_path=video_path)
+        frames = self.extract_frames(video_path)
+        return self.analyze_frames(frames) if frames else None
+    
+    @registry.timed("build_contact_sheet")
+    def build_contact_sheet(self, frames, max_size=768):
+        """Reduz os frames e monta uma grade (contact sheet) em uma única imagem
+
+        A grade cabe em max_size x max_size: com 768 ela ocupa um único bloco
+        de 768x768 do Gemini (258 tokens).
+        """
+        import cv2
+        import numpy as np
+        
+        count = len(frames)
+        height, width = frames[0].shape[:2]
+        
+        # Escolhe o número de colunas para a grade ficar próxima de um quadrado
+        cols = min(count, int(np.ceil(np.sqrt(count * height / width))))
+        rows = int(np.ceil(count / cols))
+        tile_width = max(min(max_size // cols, (max_size // rows) * width // height), 1)
+        tile_height = max(height * tile_width // width, 1)
+        
+        tiles = np.zeros((rows * cols, tile_height, tile_width, 3), dtype=np.uint8)
+        for i, frame in enumerate(frames):
+            tiles[i] = cv2.resize(frame, (tile_width, tile_height), interpolation=cv2.INTER_AREA)
+        
+        # (rows*cols, h, w, 3) -> (rows*h, cols*w, 3)
+        return (
+            tiles.reshape(rows, cols, tile_height, tile_width, 3)
+            .transpose(0, 2, 1, 3, 4)
+            .reshape(rows * tile_height, cols * tile_width, 3)
+        )
+    
+    @registry.timed("analyze_frames")
     def analyze_frames(self, frames):
         """Analisa frames usando Google Gemini"""
+        import requests
+        
         try:
             # Prepara a requisição para o Gemini
+            if self.analysis_mode == "contact_sheet" and len(frames) > 1:
+                images = [self.build_contact_sheet(frames)]
+                prompt = self.CONTACT_SHEET_PROMPT.format(count=len(frames))
+            else:
+                images = frames
+                prompt = self.FRAMES_PROMPT
+            
             parts = [
                 {
-                    "text": "Analise estas imagens de um produto e forneça um título curto e atraente que descreva o produto. Foque nas características principais e no uso do produto. Responda APENAS com o título, sem explicações adicionais."
+                    "text": prompt
                 }
             ]
             
-            # Adiciona cada frame como uma imagem
-            for frame in frames:
-                base64_frame = self.encode_frame(frame)
+            # Adiciona cada imagem
+            for image in images:
+                base64_frame = self.encode_frame(image)
                 if base64_frame:
                     parts.append({
                         "inlineData": {
@@ -94,6 +251,9 @@ class VideoAnalyzer:
                     "parts": parts
                 }]
             }
+            body = json.dumps(payload)
+            registry.inc("gemini_payload_bytes", len(body), mode=self.analysis_mode)
+            registry.inc("gemini_images", len(parts) - 1, mode=self.analysis_mode)
             
             # Faz a requisição para a API
             headers = {
@@ -103,11 +263,15 @@ class VideoAnalyzer:
             response = requests.post(
                 self.api_url,
                 headers=headers,
-                json=payload
+                data=body
             )
             
+            registry.inc("gemini_requests", status=response.status_code)
             if response.status_code == 200:
                 result = response.json()
+                usage = result.get('usageMetadata', {})
+                if 'promptTokenCount' in usage:
+                    registry.inc("gemini_prompt_tokens", usage['promptTokenCount'], mode=self.analysis_mode)
                 if 'candidates' in result and len(result['candidates']) > 0:
                     title = result['candidates'][0]['content']['parts'][0]['text'].strip()
                     return title
@@ -115,7 +279,7 @@ class VideoAnalyzer:
             return None
         
         except Exception as e:
-            print(f"Erro na análise de frames: {str(e)}")
+            log_event(logger, "Erro na análise de frames", level=logging.ERROR, mode=self.analysis_mode, error=str(e))
             return None
 
 class VideoExtractor:
@@ -123,9 +287,22 @@ class VideoExtractor:
         self.videos = set()
         self.network_urls = set()
         self.analyzer = VideoAnalyzer(api_key)
+        # Tempos de espera (segundos) usados durante a navegação
+        self.initial_wait = 15
+        self.scroll_pause = 2
+        self.network_monitor_seconds = 5
+        self.output_folder = 'videos_temu'
+        self.wait_before_close = True  # Pede ENTER antes de fechar o navegador
+        self.stream_analysis = True  # Analisa MP4 faststart enquanto baixa
+        self.content_hashes = {}  # sha256 do conteúdo -> arquivo já salvo
         
+    @registry.timed("setup_driver")
     def setup_driver(self):
         """Configura o driver com capacidades de interceptação de rede"""
+        # Importados aqui para quem só analisa vídeos não carregar o Selenium
+        import undetected_chromedriver as uc
+        from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+        
         caps = DesiredCapabilities.CHROME
         caps['goog:loggingPrefs'] = {'performance': 'ALL'}
         
@@ -145,6 +322,7 @@ class VideoExtractor:
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         return driver
     
+    @registry.timed("process_browser_logs")
     def process_browser_logs(self, driver):
         """Processa logs do browser para encontrar requisições de rede"""
         logs = driver.get_log('performance')
@@ -160,7 +338,7 @@ class VideoExtractor:
                         url = log['params']['request'].get('url', '')
                         if self.is_video_url(url):
                             self.network_urls.add(url)
-                            print(f"Encontrado vídeo via rede: {url}")
+                            log_event(logger, "Encontrado vídeo", source="rede", url=url)
             except Exception as e:
                 continue
     
@@ -186,7 +364,7 @@ class VideoExtractor:
         for url in xhr_logs:
             if self.is_video_url(url):
                 self.network_urls.add(url)
-                print(f"Encontrado vídeo via XHR: {url}")
+                log_event(logger, "Encontrado vídeo", source="xhr", url=url)
     
     def extract_from_scripts(self, driver):
         """Extrai URLs de vídeo de scripts na página"""
@@ -216,7 +394,7 @@ class VideoExtractor:
             for url in urls:
                 if self.is_video_url(url):
                     self.network_urls.add(url)
-                    print(f"Encontrado vídeo em script: {url}")
+                    log_event(logger, "Encontrado vídeo", source="script", url=url)
     
     def extract_urls_from_json(self, data):
         """Extrai URLs de vídeo de objetos JSON"""
@@ -224,7 +402,7 @@ class VideoExtractor:
             for key, value in data.items():
                 if isinstance(value, str) and self.is_video_url(value):
                     self.network_urls.add(value)
-                    print(f"Encontrado vídeo em JSON: {value}")
+                    log_event(logger, "Encontrado vídeo", source="json", url=value)
                 elif isinstance(value, (dict, list)):
                     self.extract_urls_from_json(value)
         elif isinstance(data, list):
@@ -233,7 +411,7 @@ class VideoExtractor:
                     self.extract_urls_from_json(item)
                 elif isinstance(item, str) and self.is_video_url(item):
                     self.network_urls.add(item)
-                    print(f"Encontrado vídeo em JSON: {item}")
+                    log_event(logger, "Encontrado vídeo", source="json", url=item)
     
     def extract_product_info(self, driver, url):
         """Extrai informações do produto próximo ao vídeo"""
@@ -321,27 +499,28 @@ class VideoExtractor:
             return friendly_title or "video"
             
         except Exception as e:
-            print(f"Erro ao extrair título: {str(e)}")
+            log_event(logger, "Erro ao extrair título", level=logging.WARNING, url=url, error=str(e))
             return "video"
     
     def monitor_network(self, driver, duration=10):
         """Monitora o tráfego de rede por um período"""
-        print(f"Monitorando tráfego de rede por {duration} segundos...")
+        log_event(logger, "Monitorando tráfego de rede", seconds=duration)
         end_time = time.time() + duration
         while time.time() < end_time:
             self.process_browser_logs(driver)
             self.extract_from_xhr(driver)
             time.sleep(1)
     
+    @registry.timed("scroll_and_extract")
     def scroll_and_extract(self, driver):
         """Scroll pela página e extrai vídeos"""
-        print("Iniciando scroll e extração...")
+        logger.info("Iniciando scroll e extração")
         last_height = driver.execute_script("return document.body.scrollHeight")
         
         while True:
             # Scroll até o fim
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            time.sleep(self.scroll_pause)
             
             # Extrai dados
             self.process_browser_logs(driver)
@@ -349,7 +528,7 @@ class VideoExtractor:
             self.extract_from_scripts(driver)
             
             # Monitora a rede por alguns segundos após cada scroll
-            self.monitor_network(driver, 5)
+            self.monitor_network(driver, self.network_monitor_seconds)
             
             # Verifica se chegou ao fim
             new_height = driver.execute_script("return document.body.scrollHeight")
@@ -357,10 +536,16 @@ class VideoExtractor:
                 break
             last_height = new_height
             
-            print(f"Total de vídeos encontrados até agora: {len(self.network_urls)}")
+            log_event(logger, "Vídeos encontrados até agora", videos=len(self.network_urls))
     
-    def download_and_analyze_video(self, url, output_folder, index):
-        """Baixa o vídeo e gera um título usando IA"""
+    def download_and_analyze_video(self, url, output_folder, index, analyze=True):
+        """Baixa o vídeo e gera um título usando IA
+        
+        Com analyze=False só baixa, retornando o arquivo temporário para ser
+        analisado depois (ex.: por outro worker).
+        """
+        import requests
+        
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -374,77 +559,174 @@ class VideoExtractor:
             temp_filename = f"temp_video_{index}.mp4"
             temp_filepath = os.path.join(output_folder, temp_filename)
             
-            print(f"Baixando vídeo {index}...")
+            log_event(logger, "Baixando vídeo", index=index, url=url)
             response = requests.get(url, headers=headers, stream=True, timeout=30)
             response.raise_for_status()
             
-            with open(temp_filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-            
-            # Extrai frames e analisa
-            print("Analisando vídeo com IA...")
-            frames = self.analyzer.extract_frames(temp_filepath)
-            if frames:
-                title = self.analyzer.analyze_frames(frames)
-                if not title:
-                    title = f"Produto Temu {index}"
-            else:
-                title = f"Produto Temu {index}"
-            
-            # Remove caracteres inválidos do título
-            title = re.sub(r'[<>:"/\\|?*]', '', title)
-            title = title.strip()
-            
-            # Renomeia o arquivo com o novo título
-            final_filename = f"{index:03d}_{title}.mp4"
-            final_filepath = os.path.join(output_folder, final_filename)
+            total_bytes = int(response.headers.get('Content-Length') or 0)
+            progress = DownloadProgress(total_bytes)
+            content_hash = hashlib.sha256()
+            downloaded_bytes = 0
+            header = b''
+            faststart = None
+            analysis = None
+            result = {}
             
+            start = time.perf_counter()
             try:
-                os.rename(temp_filepath, final_filepath)
-            except Exception as e:
-                print(f"Erro ao renomear arquivo: {str(e)}")
-                final_filepath = temp_filepath
+                with registry.timer("download"):
+                    with open(temp_filepath, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=8192):
+                            if not chunk:
+                                continue
+                            f.write(chunk)
+                            content_hash.update(chunk)
+                            downloaded_bytes += len(chunk)
+                            
+                            # Modo streaming só funciona com tamanho conhecido
+                            if not analyze or not self.stream_analysis or not total_bytes:
+                                continue
+                            
+                            f.flush()
+                            progress.update(downloaded_bytes)
+                            
+                            if faststart is None:
+                                header += chunk
+                                faststart = VideoAnalyzer.probe_faststart(header)
+                                if faststart is None and len(header) >= 64 * 1024:
+                                    faststart = False
+                            
+                            # Com o moov completo no disco já dá para começar a análise
+                            if faststart and analysis is None and downloaded_bytes >= faststart[1]:
+                                log_event(logger, "MP4 faststart detectado, analisando durante o download", index=index)
+                                analysis = threading.Thread(
+                                    target=self._analyze_while_downloading,
+                                    args=(temp_filepath, progress, faststart[1], start, result),
+                                    daemon=True
+                                )
+                                analysis.start()
+                    elapsed = time.perf_counter() - start
+            finally:
+                progress.finish()
+                if analysis:
+                    analysis.join()
+            
+            throughput = downloaded_bytes / elapsed if elapsed > 0 else 0
+            registry.inc("download_bytes", downloaded_bytes)
+            registry.observe("download_bytes_per_second", throughput, buckets=THROUGHPUT_BUCKETS)
+            log_event(logger, "Vídeo baixado", index=index, bytes=downloaded_bytes,
+                      seconds=round(elapsed, 3), bytes_per_second=int(throughput))
+            
+            # Ignora vídeos com conteúdo idêntico a um já baixado
+            digest = content_hash.hexdigest()
+            if digest in self.content_hashes:
+                os.remove(temp_filepath)
+                registry.inc("videos_duplicated")
+                log_event(logger, "Vídeo idêntico a um já baixado, ignorando", index=index, url=url,
+                          duplicate_of=os.path.basename(self.content_hashes[digest]))
+                return None
+            
+            if not analyze:
+                self.content_hashes[digest] = temp_filepath
+                return temp_filepath
+            
+            if 'frames' in result:
+                title = result.get('title')
+            else:
+                # Arquivo sem faststart (ou análise antecipada falhou): analisa o arquivo completo
+                title = self.analyzer.analyze_file(temp_filepath)
+                registry.observe("time_to_title_seconds", time.perf_counter() - start)
             
-            print(f"✓ Baixado e analisado: {os.path.basename(final_filepath)}")
+            final_filepath = self.finalize_video(temp_filepath, output_folder, index, title)
+            self.content_hashes[digest] = final_filepath
             return final_filepath
             
         except Exception as e:
-            print(f"✗ Erro ao processar vídeo {index}: {str(e)}")
+            registry.inc("videos_failed")
+            log_event(logger, "✗ Erro ao processar vídeo", level=logging.ERROR, index=index, url=url, error=str(e))
             return None
     
+    @staticmethod
+    def final_filename(index, title):
+        """Nome final do vídeo, com o título"""
+        if not title:
+            title = f"Produto Temu {index}"
+        
+        # Remove caracteres inválidos do título
+        title = re.sub(r'[<>:"/\\|?*]', '', title)
+        title = title.strip()
+        
+        return f"{index:03d}_{title}.mp4"
+    
+    @classmethod
+    def final_path(cls, output_folder, index, title):
+        """Caminho final do vídeo, com o título no nome do arquivo"""
+        return os.path.join(output_folder, cls.final_filename(index, title))
+    
+    def finalize_video(self, temp_filepath, output_folder, index, title):
+        """Renomeia o arquivo temporário com o título gerado"""
+        # Renomeia o arquivo com o novo título
+        final_filepath = self.final_path(output_folder, index, title)
+        title = title or f"Produto Temu {index}"
+        
+        try:
+            os.rename(temp_filepath, final_filepath)
+        except Exception as e:
+            log_event(logger, "Erro ao renomear arquivo", level=logging.WARNING, index=index,
+                      video_path=temp_filepath, error=str(e))
+            final_filepath = temp_filepath
+        
+        registry.inc("videos_processed")
+        log_event(logger, "✓ Baixado e analisado", index=index, video_path=final_filepath, title=title)
+        return final_filepath
+    
+    def _analyze_while_downloading(self, video_path, progress, moov_end, start, result):
+        """Extrai frames e gera o título enquanto o restante do vídeo é baixado"""
+        try:
+            frames = self.analyzer.extract_frames_from_partial(video_path, progress, moov_end)
+            if frames:
+                result['frames'] = frames
+                result['title'] = self.analyzer.analyze_frames(frames)
+                registry.observe("time_to_title_seconds", time.perf_counter() - start)
+        except Exception as e:
+            log_event(logger, "Erro na análise durante o download", level=logging.WARNING,
+                      video_path=video_path, error=str(e))
+    
+    def collect_video_urls(self, driver, url):
+        """Carrega a página e retorna as URLs de vídeo encontradas"""
+        # Carrega a página
+        driver.get(url)
+        log_event(logger, "Aguardando carregamento inicial", seconds=self.initial_wait)
+        time.sleep(self.initial_wait)
+        
+        # Extrai vídeos
+        self.scroll_and_extract(driver)
+        return list(self.network_urls)
+    
     def process_page(self, url):
         """Processa uma página para encontrar e baixar vídeos"""
         try:
-            print(f"\nAcessando: {url}")
+            log_event(logger, "Acessando página", url=url)
             driver = self.setup_driver()
             
             try:
-                # Carrega a página
-                driver.get(url)
-                print("Aguardando carregamento inicial (15s)...")
-                time.sleep(15)
-                
-                # Extrai vídeos
-                self.scroll_and_extract(driver)
+                self.collect_video_urls(driver, url)
                 
                 if not self.network_urls:
-                    print("Nenhum vídeo encontrado.")
+                    log_event(logger, "Nenhum vídeo encontrado", level=logging.WARNING, url=url)
                     return []
                 
-                print(f"\nEncontrados {len(self.network_urls)} vídeos únicos!")
+                log_event(logger, "Vídeos únicos encontrados", videos=len(self.network_urls), url=url)
                 
                 # Cria pasta para os vídeos
-                output_folder = 'videos_temu'
+                output_folder = self.output_folder
                 if not os.path.exists(output_folder):
                     os.makedirs(output_folder)
                 
                 # Baixa e analisa os vídeos
                 downloaded_files = []
                 for i, video_url in enumerate(self.network_urls, 1):
-                    print(f"\nProcessando vídeo {i}/{len(self.network_urls)}")
-                    print(f"URL: {video_url}")
+                    log_event(logger, "Processando vídeo", index=i, total=len(self.network_urls), url=video_url)
                     
                     filepath = self.download_and_analyze_video(video_url, output_folder, i)
                     if filepath:
@@ -453,14 +735,15 @@ class VideoExtractor:
                 return downloaded_files
                 
             finally:
-                input("\nPressione ENTER para fechar o navegador...")
+                if self.wait_before_close:
+                    input("\nPressione ENTER para fechar o navegador...")
                 try:
                     driver.quit()
                 except:
                     pass
                 
         except Exception as e:
-            print(f"Erro: {str(e)}")
+            log_event(logger, "Erro ao processar página", level=logging.ERROR, url=url, error=str(e))
             return []
 
 def main():
@@ -481,6 +764,9 @@ def main():
             print(f"- {file}")
     else:
         print("\nNenhum vídeo foi baixado.")
+    
+    # Salva as métricas da execução
+    registry.export("metrics_extractor")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,24 @@
+import unittest
+
+from metrics import Histogram, MetricsRegistry
+
+class HistogramTest(unittest.TestCase):
+    def test_keeps_only_recent_samples(self):
+        histogram = Histogram(max_samples=3)
+        for value in (10, 20, 30, 1, 2):
+            histogram.observe(value)
+
+        self.assertEqual(list(histogram.samples), [30, 1, 2])
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.percentile(50), 2)
+
+class PrometheusExportTest(unittest.TestCase):
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        registry.inc("uploads", channel='canal "A"\\B\nC')
+
+        line = registry.to_prometheus().splitlines()[1]
+        self.assertEqual(line, 'shorts_uploads_total{channel="canal \\"A\\"\\\\B\\nC"} 1')
+
+if __name__ == "__main__":
+    unittest.main()
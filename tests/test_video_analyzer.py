@@ -0,0 +1,87 @@
+import struct
+import unittest
+
+try:
+    import cv2  # noqa: F401 (usado por build_contact_sheet)
+    import numpy as np
+except ImportError:  # opencv-python/numpy não instalados
+    np = None
+
+from temu_video_extractor import VideoAnalyzer
+
+def box(box_type, body=b''):
+    return struct.pack('>I4s', 8 + len(body), box_type) + body
+
+def large_box(box_type, body=b''):
+    """Box com tamanho estendido de 64 bits (size == 1)"""
+    return struct.pack('>I4sQ', 1, box_type, 16 + len(body)) + body
+
+class ProbeFaststartTest(unittest.TestCase):
+    def test_moov_before_mdat(self):
+        header = box(b'ftyp', b'isom') + box(b'moov', b'x' * 100) + box(b'mdat', b'dados')
+        self.assertEqual(VideoAnalyzer.probe_faststart(header), (12, 120))
+
+    def test_mdat_before_moov(self):
+        header = box(b'ftyp', b'isom') + box(b'free') + box(b'mdat', b'dados') + box(b'moov')
+        self.assertIs(VideoAnalyzer.probe_faststart(header), False)
+
+    def test_needs_more_bytes(self):
+        ftyp = box(b'ftyp', b'isom')
+        self.assertIsNone(VideoAnalyzer.probe_faststart(b''))
+        self.assertIsNone(VideoAnalyzer.probe_faststart(ftyp[:5]))
+        # O ftyp inteiro chegou, mas o próximo header ainda não
+        self.assertIsNone(VideoAnalyzer.probe_faststart(ftyp + b'\x00\x00'))
+
+    def test_64_bit_box_size(self):
+        header = large_box(b'free', b'x' * 20) + box(b'moov', b'y' * 10)
+        self.assertEqual(VideoAnalyzer.probe_faststart(header), (36, 54))
+        self.assertEqual(VideoAnalyzer.probe_faststart(large_box(b'moov', b'y' * 10)), (0, 26))
+        # Tamanho estendido cortado no meio
+        self.assertIsNone(VideoAnalyzer.probe_faststart(large_box(b'free')[:12]))
+
+    def test_size_zero_box_runs_to_end_of_file(self):
+        header = box(b'ftyp', b'isom') + struct.pack('>I4s', 0, b'mdat') + b'dados'
+        self.assertIs(VideoAnalyzer.probe_faststart(header), False)
+
+    def test_invalid_size(self):
+        header = box(b'ftyp', b'isom') + struct.pack('>I4s', 4, b'free') + box(b'moov')
+        self.assertIs(VideoAnalyzer.probe_faststart(header), False)
+
+@unittest.skipIf(np is None, "opencv-python/numpy não instalados")
+class ContactSheetTest(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = VideoAnalyzer("chave", analysis_mode="contact_sheet")
+
+    def frames(self, count, height, width):
+        return [np.full((height, width, 3), i * 10, dtype=np.uint8) for i in range(count)]
+
+    def test_grid_fits_one_gemini_tile(self):
+        for count in (2, 3, 6, 12, 16):
+            for height, width in ((1280, 720), (720, 1280), (1080, 1080), (1920, 1080)):
+                with self.subTest(count=count, size=(width, height)):
+                    sheet = self.analyzer.build_contact_sheet(self.frames(count, height, width))
+                    self.assertLessEqual(sheet.shape[0], 768)
+                    self.assertLessEqual(sheet.shape[1], 768)
+                    self.assertEqual(sheet.shape[2], 3)
+
+    def test_portrait_grid_layout(self):
+        # 12 frames 9:16 -> 5 colunas x 3 linhas de 144x256
+        sheet = self.analyzer.build_contact_sheet(self.frames(12, 1280, 720))
+        self.assertEqual(sheet.shape, (768, 720, 3))
+
+    def test_frames_in_reading_order(self):
+        sheet = self.analyzer.build_contact_sheet(self.frames(4, 100, 100))
+        # 2x2 tiles de 384x384: esquerda para a direita, de cima para baixo
+        self.assertEqual(sheet.shape, (768, 768, 3))
+        self.assertEqual([sheet[0, 0, 0], sheet[0, 384, 0], sheet[384, 0, 0], sheet[384, 384, 0]],
+                         [0, 10, 20, 30])
+
+    def test_empty_cells_stay_black(self):
+        frames = [np.full((100, 100, 3), 200, dtype=np.uint8)] * 3
+        sheet = self.analyzer.build_contact_sheet(frames)
+        # 3 frames em uma grade 2x2: a última célula fica vazia
+        self.assertEqual(sheet[0, 0].tolist(), [200, 200, 200])
+        self.assertEqual(sheet[-1, -1].tolist(), [0, 0, 0])
+
+if __name__ == "__main__":
+    unittest.main()
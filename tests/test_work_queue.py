@@ -0,0 +1,173 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import uuid
+from unittest import mock
+
+from artifacts import DirectoryArtifactStore
+from work_queue import SQLiteQueue, RedisQueue
+from worker import AnalyzeWorker, Heartbeat, LeaseLost, Worker
+
+class QueueContract:
+    """Comportamento esperado de qualquer JobQueue"""
+
+    def make_queue(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.queue = self.make_queue()
+
+    def test_enqueue_with_key_is_not_duplicated(self):
+        first = self.queue.enqueue("analyze", {'video': 'a.mp4'}, key="crawl:1:a")
+        second = self.queue.enqueue("analyze", {'video': 'outro.mp4'}, key="crawl:1:a")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.queue.find("crawl:1:a"), first)
+        self.assertIsNone(self.queue.find("crawl:1:b"))
+        self.assertEqual(self.queue.stats(), {'analyze': {'pending': 1}})
+
+    def test_lease_is_exclusive(self):
+        self.queue.enqueue("crawl", {'url': 'x'})
+
+        job = self.queue.lease("crawl", "w1")
+        self.assertEqual(job.payload, {'url': 'x'})
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNone(self.queue.lease("crawl", "w2"))
+
+    def test_expired_lease_goes_to_another_worker(self):
+        self.queue.enqueue("crawl", {'url': 'x'})
+        job = self.queue.lease("crawl", "w1", lease_seconds=0.2)
+        time.sleep(0.3)
+
+        retry = self.queue.lease("crawl", "w2")
+        self.assertEqual(retry.id, job.id)
+        self.assertEqual(retry.attempts, 2)
+        # O worker antigo perdeu o job: não renova nem conclui
+        self.assertFalse(self.queue.heartbeat(job, "w1"))
+        self.assertFalse(self.queue.complete(job, "w1"))
+        self.assertTrue(self.queue.complete(retry, "w2", {'ok': True}))
+        self.assertEqual(self.queue.stats(), {'crawl': {'done': 1}})
+
+    def test_heartbeat_extends_lease(self):
+        self.queue.enqueue("crawl", {'url': 'x'})
+        job = self.queue.lease("crawl", "w1", lease_seconds=0.2)
+
+        self.assertTrue(self.queue.heartbeat(job, "w1", lease_seconds=30))
+        time.sleep(0.3)
+        self.assertIsNone(self.queue.lease("crawl", "w2"))
+
+    def test_fail_backs_off_before_retry(self):
+        self.queue.enqueue("crawl", {'url': 'x'})
+        job = self.queue.lease("crawl", "w1")
+
+        self.assertTrue(self.queue.fail(job, "w1", "erro", retry_delay=60))
+        self.assertIsNone(self.queue.lease("crawl", "w1"))
+        self.assertEqual(self.queue.stats(), {'crawl': {'pending': 1}})
+
+    def test_job_is_dead_after_max_attempts(self):
+        self.queue.enqueue("crawl", {'url': 'x'}, max_attempts=2)
+
+        for _ in range(2):
+            job = self.queue.lease("crawl", "w1")
+            self.assertTrue(self.queue.fail(job, "w1", "erro", retry_delay=0))
+
+        self.assertIsNone(self.queue.lease("crawl", "w1"))
+        self.assertEqual(self.queue.stats(), {'crawl': {'dead': 1}})
+        dead = self.queue.dead_jobs()
+        self.assertEqual([(d['id'], d['attempts'], d['error']) for d in dead], [(job.id, 2, "erro")])
+        self.assertEqual(self.queue.dead_jobs("analyze"), [])
+
+    def test_expired_lease_on_last_attempt_is_dead(self):
+        self.queue.enqueue("crawl", {'url': 'x'}, max_attempts=1)
+        self.queue.lease("crawl", "w1", lease_seconds=0.2)
+        time.sleep(0.3)
+
+        self.assertIsNone(self.queue.lease("crawl", "w2"))
+        self.assertEqual(self.queue.dead_jobs()[0]['error'], "lease expirado")
+
+    def test_checkpoint_is_kept_between_attempts(self):
+        self.queue.enqueue("analyze", {'video': 'a.mp4'})
+        job = self.queue.lease("analyze", "w1")
+
+        self.assertFalse(self.queue.checkpoint(job, "w2", {'title': 'outro'}))
+        self.assertTrue(self.queue.checkpoint(job, "w1", {'title': 'Título'}))
+        self.queue.fail(job, "w1", "erro", retry_delay=0)
+
+        self.assertEqual(self.queue.lease("analyze", "w1").progress, {'title': 'Título'})
+
+class SQLiteQueueTest(QueueContract, unittest.TestCase):
+    def make_queue(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        return SQLiteQueue(os.path.join(folder, "jobs.db"))
+
+@unittest.skipUnless(os.environ.get("REDIS_URL"), "REDIS_URL não definido")
+class RedisQueueTest(QueueContract, unittest.TestCase):
+    def make_queue(self):
+        queue = RedisQueue(os.environ["REDIS_URL"], prefix=f"test:{uuid.uuid4().hex}")
+        self.addCleanup(lambda: queue.client.delete(*queue.client.keys(f"{queue.prefix}:*") or ['-']))
+        return queue
+
+class HeartbeatTest(unittest.TestCase):
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        self.queue = SQLiteQueue(os.path.join(folder, "jobs.db"))
+        self.queue.enqueue("crawl", {'url': 'x'})
+
+    def test_lost_lease_stops_the_job(self):
+        job = self.queue.lease("crawl", "w1", lease_seconds=0.3)
+        worker = Worker(self.queue, worker_id="w1", lease_seconds=0.3)
+
+        with Heartbeat(self.queue, job, "w1", 0.3) as heartbeat:
+            worker._heartbeat = heartbeat
+            # Outro worker assume o job (ex.: este ficou parado além do lease)
+            self.queue.fail(job, "w1", "simulado", retry_delay=0)
+            self.queue.lease("crawl", "w2")
+            time.sleep(0.3)
+            self.assertTrue(heartbeat.lost)
+            with self.assertRaises(LeaseLost):
+                worker.check_lease()
+
+    def test_heartbeat_keeps_lease(self):
+        job = self.queue.lease("crawl", "w1", lease_seconds=0.3)
+
+        with Heartbeat(self.queue, job, "w1", 0.3) as heartbeat:
+            time.sleep(0.5)
+            self.assertIsNone(self.queue.lease("crawl", "w2"))
+        self.assertFalse(heartbeat.lost)
+
+class AnalyzeWorkerTest(unittest.TestCase):
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        self.queue = SQLiteQueue(os.path.join(folder, "jobs.db"))
+        self.artifacts = DirectoryArtifactStore(os.path.join(folder, "videos"))
+
+        video = os.path.join(folder, "temp_video_1.mp4")
+        with open(video, 'wb') as f:
+            f.write(b'mp4')
+        self.artifacts.put(video, "job_1/temp_video_1.mp4")
+        self.queue.enqueue("analyze", {'video': "job_1/temp_video_1.mp4", 'index': 1, 'channels': ['c1']})
+
+        self.worker = AnalyzeWorker(self.queue, "chave", self.artifacts, worker_id="w1")
+
+    def test_retry_after_rename_does_not_analyze_again(self):
+        job = self.queue.lease("analyze", "w1")
+        with mock.patch.object(self.worker.analyzer, 'analyze_file', return_value="Garrafa Térmica") as analyze:
+            result = self.worker.handle(job)
+            # Falha depois de renomear (ex.: o worker caiu antes de concluir)
+            self.queue.fail(job, "w1", "simulado", retry_delay=0)
+            retry = self.queue.lease("analyze", "w1")
+            self.assertEqual(self.worker.handle(retry), result)
+
+        analyze.assert_called_once()
+        self.assertEqual(result['video'], "job_1/001_Garrafa Térmica.mp4")
+        self.assertTrue(self.artifacts.exists(result['video']))
+        self.assertFalse(self.artifacts.exists("job_1/temp_video_1.mp4"))
+        self.assertEqual(self.queue.stats()['upload:c1'], {'pending': 1})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+import json
+import threading
+import unittest
+from unittest import mock
+
+try:
+    from googleapiclient.discovery import build
+    from googleapiclient.http import HttpMockSequence
+except ImportError:  # google-api-python-client não instalado
+    build = None
+
+from youtube_shorts_uploader import AuthorizationRequired, CredentialManager, YouTubeShortsUploader
+
+BOUNDARY = "batch_boundary"
+
+def batch_response(*items):
+    """Monta uma resposta multipart de batch; cada item é (status, corpo)"""
+    parts = []
+    for i, (status, body) in enumerate(items):
+        parts.append(
+            f"--{BOUNDARY}\r\n"
+            "Content-Type: application/http\r\n"
+            "Content-Transfer-Encoding: binary\r\n"
+            f"Content-ID: <response-test + {i}>\r\n"
+            "\r\n"
+            f"HTTP/1.1 {status} X\r\n"
+            "Content-Type: application/json\r\n"
+            "\r\n"
+            f"{json.dumps(body)}\r\n"
+        )
+    content = ''.join(parts) + f"--{BOUNDARY}--\r\n"
+    headers = {'status': '200', 'content-type': f'multipart/mixed; boundary="{BOUNDARY}"'}
+    return (headers, content)
+
+def error(status, reason):
+    return (status, {'error': {'code': status, 'errors': [{'reason': reason}], 'message': reason}})
+
+def video(video_id):
+    return (200, {'id': video_id, 'status': {'privacyStatus': 'public'}})
+
+@unittest.skipIf(build is None, "google-api-python-client não instalado")
+class ExecuteBatchTest(unittest.TestCase):
+    def make_uploader(self, responses, batch_size=50):
+        manager = CredentialManager("client_secrets.json", ["https://www.googleapis.com/auth/youtube"])
+        uploader = YouTubeShortsUploader("client_secrets.json", "teste", manager=manager)
+        uploader.batch_size = batch_size
+        uploader.youtube = build(
+            "youtube", "v3",
+            http=HttpMockSequence(responses),
+            static_discovery=True,
+            cache_discovery=False
+        )
+        return uploader
+
+    def test_publish_success(self):
+        uploader = self.make_uploader([batch_response(video('a'), video('b'))])
+        results = uploader.publish_videos(['a', 'b'])
+        self.assertTrue(all(r['ok'] for r in results.values()))
+        self.assertEqual(uploader.quota_used, 100)
+
+    @mock.patch('youtube_shorts_uploader.time.sleep')
+    def test_retries_rate_limited_items_without_charging_quota(self, sleep):
+        uploader = self.make_uploader([
+            batch_response(video('a'), error(429, 'rateLimitExceeded')),
+            batch_response(video('b')),
+        ])
+        results = uploader.publish_videos(['a', 'b'])
+        self.assertTrue(results['a']['ok'])
+        self.assertTrue(results['b']['ok'])
+        self.assertEqual(uploader.quota_used, 100)
+        sleep.assert_called_once()
+
+    def test_non_retryable_error_is_reported(self):
+        uploader = self.make_uploader([batch_response(video('a'), error(403, 'insufficientPermissions'))])
+        results = uploader.publish_videos(['a', 'b'])
+        self.assertTrue(results['a']['ok'])
+        self.assertFalse(results['b']['ok'])
+        self.assertIn('insufficientPermissions', results['b']['error'])
+
+    def test_quota_exceeded_marks_remaining_operations(self):
+        uploader = self.make_uploader(
+            [batch_response(video('a'), error(403, 'quotaExceeded'))],
+            batch_size=2
+        )
+        results = uploader.publish_videos(['a', 'b', 'c', 'd'])
+        self.assertEqual(set(results), {'a', 'b', 'c', 'd'})
+        self.assertTrue(results['a']['ok'])
+        self.assertFalse(results['b']['ok'])
+        self.assertEqual(results['c'], {'ok': False, 'response': None, 'error': 'quota'})
+        self.assertEqual(results['d']['error'], 'quota')
+        self.assertEqual(uploader.remaining_quota(), 0)
+
+    def test_skips_operations_over_remaining_quota(self):
+        uploader = self.make_uploader([batch_response(video('a'))])
+        uploader.quota_used = uploader.daily_quota - 50
+        results = uploader.publish_videos(['a', 'b'])
+        self.assertTrue(results['a']['ok'])
+        self.assertEqual(results['b']['error'], 'quota')
+
+class CredentialScopesTest(unittest.TestCase):
+    def test_token_missing_scope_requires_new_consent(self):
+        manager = CredentialManager("client_secrets.json", [
+            "https://www.googleapis.com/auth/youtube.upload",
+            "https://www.googleapis.com/auth/youtube"
+        ])
+        old_token = mock.Mock(valid=True)
+        old_token.has_scopes.return_value = False
+        new_token = mock.Mock(valid=True, refresh_token=None)
+
+        with mock.patch.object(manager, '_load_credentials', return_value=old_token), \
+             mock.patch.object(manager, '_login', return_value=new_token) as login, \
+             mock.patch.object(manager, '_save_credentials'):
+            self.assertIs(manager.get_credentials("canal"), new_token)
+        login.assert_called_once()
+
+    def test_non_interactive_never_opens_login(self):
+        manager = CredentialManager("client_secrets.json", ["https://www.googleapis.com/auth/youtube"])
+
+        with mock.patch.object(manager, '_load_credentials', return_value=None), \
+             mock.patch.object(manager, '_login') as login:
+            with self.assertRaises(AuthorizationRequired):
+                manager.get_credentials("canal", interactive=False)
+        login.assert_not_called()
+
+    def test_non_interactive_refresh_failure_requires_authorization(self):
+        from google.auth.exceptions import RefreshError, TransportError
+
+        manager = CredentialManager("client_secrets.json", ["https://www.googleapis.com/auth/youtube"])
+        for error in (RefreshError("invalid_grant"), TransportError("sem rede")):
+            expired = mock.Mock(valid=False, refresh_token="refresh")
+            expired.has_scopes.return_value = True
+            expired.refresh.side_effect = error
+
+            with mock.patch.object(manager, '_load_credentials', return_value=expired), \
+                 mock.patch.object(manager, '_login') as login:
+                with self.assertRaises(AuthorizationRequired):
+                    manager.get_credentials("canal", interactive=False)
+            login.assert_not_called()
+
+class CredentialLockTest(unittest.TestCase):
+    def test_slow_refresh_does_not_block_other_channels(self):
+        manager = CredentialManager("client_secrets.json", ["https://www.googleapis.com/auth/youtube"])
+        started, release = threading.Event(), threading.Event()
+
+        slow = mock.Mock(valid=False, refresh_token="refresh")
+        slow.has_scopes.return_value = True
+
+        def refresh(request):
+            started.set()
+            release.wait(5)
+            slow.valid = True
+
+        slow.refresh.side_effect = refresh
+        fast = mock.Mock(valid=True, refresh_token=None)
+        fast.has_scopes.return_value = True
+
+        def load(channel_name):
+            return slow if channel_name == "lento" else fast
+
+        with mock.patch.object(manager, '_load_credentials', side_effect=load), \
+             mock.patch.object(manager, '_save_credentials'):
+            thread = threading.Thread(target=manager.get_credentials, args=("lento",), daemon=True)
+            thread.start()
+            self.assertTrue(started.wait(5))
+            try:
+                # O refresh do outro canal ainda está em andamento
+                self.assertIs(manager.get_credentials("rapido"), fast)
+            finally:
+                release.set()
+                thread.join(5)
+
+    def test_channel_info_respects_non_interactive(self):
+        manager = CredentialManager("client_secrets.json", ["https://www.googleapis.com/auth/youtube"])
+        uploader = YouTubeShortsUploader("client_secrets.json", "canal", manager=manager, interactive=False)
+
+        with mock.patch.object(manager, '_load_credentials', return_value=None), \
+             mock.patch.object(manager, '_login') as login:
+            self.assertIsNone(uploader.get_channel_info())
+        login.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
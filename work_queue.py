@@ -0,0 +1,476 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+
+class Job:
+    def __init__(self, id, queue, payload, attempts, max_attempts, progress=None):
+        self.id = id
+        self.queue = queue
+        self.payload = payload
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+        # Salvo com checkpoint() e mantido entre tentativas
+        self.progress = progress or {}
+
+    def __repr__(self):
+        return f"Job(id={self.id}, queue={self.queue!r}, attempts={self.attempts})"
+
+class JobQueue:
+    """Fila durável de jobs com lease, heartbeat e retry
+
+    Cada job pertence a uma fila (ex.: "crawl", "analyze", "upload:canal").
+    Um worker pega o job com lease() e precisa renová-lo com heartbeat()
+    antes de lease_expires; se o worker morrer, o lease expira e o job volta
+    a ficar disponível para outro worker.
+
+    Implementações: SQLiteQueue (uma máquina, testes) e RedisQueue (várias
+    máquinas). Use open_queue() para escolher pela URL.
+    """
+
+    def enqueue(self, queue, payload, max_attempts=5, delay=0, key=None):
+        """Adiciona um job à fila e retorna o id
+
+        Com key, um job com a mesma chave já existente não é duplicado e o id
+        dele é retornado (útil quando quem enfileira pode ser repetido).
+        """
+        raise NotImplementedError
+
+    def find(self, key):
+        """Id do job criado com a chave (ou None)"""
+        raise NotImplementedError
+
+    def lease(self, queue, worker_id, lease_seconds=300):
+        """Pega o próximo job disponível da fila (ou None)"""
+        raise NotImplementedError
+
+    def heartbeat(self, job, worker_id, lease_seconds=300):
+        """Renova o lease do job; retorna False se o lease foi perdido"""
+        raise NotImplementedError
+
+    def checkpoint(self, job, worker_id, progress):
+        """Salva o progresso do job para as próximas tentativas; retorna False se o lease foi perdido"""
+        raise NotImplementedError
+
+    def complete(self, job, worker_id, result=None):
+        """Marca o job como concluído"""
+        raise NotImplementedError
+
+    def fail(self, job, worker_id, error, retry_delay=30):
+        """Registra a falha; o job volta para a fila com backoff ou vira 'dead'"""
+        raise NotImplementedError
+
+    def stats(self):
+        """Quantidade de jobs por fila e status"""
+        raise NotImplementedError
+
+    def dead_jobs(self, queue=None):
+        """Lista os jobs que esgotaram as tentativas"""
+        raise NotImplementedError
+
+class SQLiteQueue(JobQueue):
+    """Fila guardada em um arquivo SQLite
+
+    O banco usa WAL, que só funciona com todos os processos na mesma máquina:
+    serve para rodar tudo em um computador e para os testes. Para workers em
+    várias máquinas, use RedisQueue.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        queue TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL DEFAULT 5,
+        available_at REAL NOT NULL,
+        leased_by TEXT,
+        lease_expires REAL,
+        last_error TEXT,
+        result TEXT,
+        key TEXT,
+        progress TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS jobs_queue_status ON jobs (queue, status, available_at);
+    """
+
+    def __init__(self, path="jobs.db"):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+            # Bancos criados antes das colunas key e progress
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(jobs)")]
+            for column in ('key', 'progress'):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS jobs_key ON jobs (key)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """Transação com lock de escrita, para os workers não pegarem o mesmo job"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, queue, payload, max_attempts=5, delay=0, key=None):
+        """Adiciona um job à fila e retorna o id
+
+        Com key, um job com a mesma chave já existente não é duplicado e o id
+        dele é retornado (útil quando quem enfileira pode ser repetido).
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            if key is not None:
+                row = conn.execute("SELECT id FROM jobs WHERE key = ?", (key,)).fetchone()
+                if row:
+                    return row[0]
+            cursor = conn.execute(
+                "INSERT INTO jobs (queue, payload, max_attempts, available_at, key, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (queue, json.dumps(payload, ensure_ascii=False), max_attempts, now + delay, key, now, now)
+            )
+            return cursor.lastrowid
+
+    def find(self, key):
+        """Id do job criado com a chave (ou None)"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT id FROM jobs WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def lease(self, queue, worker_id, lease_seconds=300):
+        """Pega o próximo job disponível da fila (ou None)"""
+        now = time.time()
+        with self._transaction() as conn:
+            while True:
+                row = conn.execute(
+                    "SELECT id, payload, attempts, max_attempts, progress FROM jobs "
+                    "WHERE queue = ? AND ((status = 'pending' AND available_at <= ?) "
+                    "OR (status = 'leased' AND lease_expires < ?)) "
+                    "ORDER BY available_at, id LIMIT 1",
+                    (queue, now, now)
+                ).fetchone()
+                if row is None:
+                    return None
+
+                job_id, payload, attempts, max_attempts, progress = row
+                if attempts >= max_attempts:
+                    # Lease expirado na última tentativa: o worker morreu
+                    conn.execute(
+                        "UPDATE jobs SET status = 'dead', leased_by = NULL, "
+                        "last_error = COALESCE(last_error, 'lease expirado'), updated_at = ? WHERE id = ?",
+                        (now, job_id)
+                    )
+                    continue
+
+                conn.execute(
+                    "UPDATE jobs SET status = 'leased', leased_by = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (worker_id, now + lease_seconds, now, job_id)
+                )
+                return Job(job_id, queue, json.loads(payload), attempts + 1, max_attempts,
+                           json.loads(progress) if progress else None)
+
+    def heartbeat(self, job, worker_id, lease_seconds=300):
+        """Renova o lease do job; retorna False se o lease foi perdido"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND leased_by = ?",
+                (now + lease_seconds, now, job.id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def checkpoint(self, job, worker_id, progress):
+        """Salva o progresso do job para as próximas tentativas; retorna False se o lease foi perdido"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET progress = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND leased_by = ?",
+                (json.dumps(progress, ensure_ascii=False), now, job.id, worker_id)
+            )
+            if cursor.rowcount != 1:
+                return False
+        job.progress = progress
+        return True
+
+    def complete(self, job, worker_id, result=None):
+        """Marca o job como concluído"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, leased_by = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND leased_by = ?",
+                (json.dumps(result, ensure_ascii=False), now, job.id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job, worker_id, error, retry_delay=30):
+        """Registra a falha; o job volta para a fila com backoff ou vira 'dead'"""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = 'leased' AND leased_by = ?",
+                (job.id, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+
+            attempts, max_attempts = row
+            if attempts >= max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET status = 'dead', last_error = ?, leased_by = NULL, updated_at = ? WHERE id = ?",
+                    (str(error), now, job.id)
+                )
+            else:
+                # Backoff exponencial a cada tentativa
+                conn.execute(
+                    "UPDATE jobs SET status = 'pending', last_error = ?, leased_by = NULL, "
+                    "available_at = ?, updated_at = ? WHERE id = ?",
+                    (str(error), now + retry_delay * 2 ** (attempts - 1), now, job.id)
+                )
+            return True
+
+    def stats(self):
+        """Quantidade de jobs por fila e status"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT queue, status, COUNT(*) FROM jobs GROUP BY queue, status ORDER BY queue, status"
+            ).fetchall()
+        stats = {}
+        for queue, status, count in rows:
+            stats.setdefault(queue, {})[status] = count
+        return stats
+
+    def dead_jobs(self, queue=None):
+        """Lista os jobs que esgotaram as tentativas"""
+        query = "SELECT id, queue, payload, attempts, last_error FROM jobs WHERE status = 'dead'"
+        params = ()
+        if queue:
+            query += " AND queue = ?"
+            params = (queue,)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY id", params).fetchall()
+        return [
+            {'id': id, 'queue': q, 'payload': json.loads(payload), 'attempts': attempts, 'error': error}
+            for id, q, payload, attempts, error in rows
+        ]
+
+class RedisQueue(JobQueue):
+    """Fila guardada no Redis (5 ou mais recente), para workers em várias máquinas
+
+    Cada operação roda em um script Lua, então é atômica no servidor, e o
+    horário vem do próprio Redis (TIME): os leases não dependem do relógio
+    das máquinas dos workers.
+
+    Chaves (com o prefixo): seq, job:<id> (hash), keys (chave -> id),
+    ready:<fila> e leased:<fila> (sorted sets por horário), dead, stats.
+    """
+
+    # Trechos comuns dos scripts: horário do servidor e checagem do lease
+    _NOW = """
+    local p = ARGV[1]
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    """
+    _OWNED = """
+    local job = p .. ':job:' .. ARGV[2]
+    local state = redis.call('HMGET', job, 'status', 'leased_by', 'queue')
+    if state[1] ~= 'leased' or state[2] ~= ARGV[3] then
+        return 0
+    end
+    local queue = state[3]
+    """
+
+    ENQUEUE = _NOW + """
+    local queue, key = ARGV[2], ARGV[6]
+    if key ~= '' then
+        local existing = redis.call('HGET', p .. ':keys', key)
+        if existing then
+            return tonumber(existing)
+        end
+    end
+    local id = redis.call('INCR', p .. ':seq')
+    redis.call('HSET', p .. ':job:' .. id, 'queue', queue, 'payload', ARGV[3], 'status', 'pending',
+               'attempts', 0, 'max_attempts', ARGV[4], 'created_at', now, 'updated_at', now)
+    if key ~= '' then
+        redis.call('HSET', p .. ':keys', key, id)
+    end
+    redis.call('ZADD', p .. ':ready:' .. queue, now + tonumber(ARGV[5]), id)
+    redis.call('SADD', p .. ':queues', queue)
+    redis.call('HINCRBY', p .. ':stats', queue .. '|pending', 1)
+    return id
+    """
+
+    LEASE = _NOW + """
+    local queue, worker, lease_seconds = ARGV[2], ARGV[3], tonumber(ARGV[4])
+    local ready, leased = p .. ':ready:' .. queue, p .. ':leased:' .. queue
+
+    -- Leases expirados: o worker morreu. Voltam para a fila ou, na última tentativa, viram dead
+    for _, id in ipairs(redis.call('ZRANGEBYSCORE', leased, '-inf', '(' .. now)) do
+        local job = p .. ':job:' .. id
+        local counts = redis.call('HMGET', job, 'attempts', 'max_attempts')
+        redis.call('ZREM', leased, id)
+        redis.call('HINCRBY', p .. ':stats', queue .. '|leased', -1)
+        if tonumber(counts[1]) >= tonumber(counts[2]) then
+            redis.call('HSET', job, 'status', 'dead', 'leased_by', '', 'updated_at', now)
+            redis.call('HSETNX', job, 'last_error', 'lease expirado')
+            redis.call('ZADD', p .. ':dead', now, id)
+            redis.call('HINCRBY', p .. ':stats', queue .. '|dead', 1)
+        else
+            redis.call('HSET', job, 'status', 'pending', 'leased_by', '', 'updated_at', now)
+            redis.call('ZADD', ready, now, id)
+            redis.call('HINCRBY', p .. ':stats', queue .. '|pending', 1)
+        end
+    end
+
+    local ids = redis.call('ZRANGEBYSCORE', ready, '-inf', now, 'LIMIT', 0, 1)
+    if #ids == 0 then
+        return false
+    end
+    local id = ids[1]
+    local job = p .. ':job:' .. id
+    redis.call('ZREM', ready, id)
+    local attempts = redis.call('HINCRBY', job, 'attempts', 1)
+    redis.call('HSET', job, 'status', 'leased', 'leased_by', worker,
+               'lease_expires', now + lease_seconds, 'updated_at', now)
+    redis.call('ZADD', leased, now + lease_seconds, id)
+    redis.call('HINCRBY', p .. ':stats', queue .. '|pending', -1)
+    redis.call('HINCRBY', p .. ':stats', queue .. '|leased', 1)
+    local fields = redis.call('HMGET', job, 'payload', 'max_attempts', 'progress')
+    return {id, fields[1], attempts, fields[2], fields[3] or ''}
+    """
+
+    HEARTBEAT = _NOW + _OWNED + """
+    local expires = now + tonumber(ARGV[4])
+    redis.call('HSET', job, 'lease_expires', expires, 'updated_at', now)
+    redis.call('ZADD', p .. ':leased:' .. queue, expires, ARGV[2])
+    return 1
+    """
+
+    CHECKPOINT = _NOW + _OWNED + """
+    redis.call('HSET', job, 'progress', ARGV[4], 'updated_at', now)
+    return 1
+    """
+
+    COMPLETE = _NOW + _OWNED + """
+    redis.call('HSET', job, 'status', 'done', 'result', ARGV[4], 'leased_by', '', 'updated_at', now)
+    redis.call('ZREM', p .. ':leased:' .. queue, ARGV[2])
+    redis.call('HINCRBY', p .. ':stats', queue .. '|leased', -1)
+    redis.call('HINCRBY', p .. ':stats', queue .. '|done', 1)
+    return 1
+    """
+
+    FAIL = _NOW + _OWNED + """
+    local counts = redis.call('HMGET', job, 'attempts', 'max_attempts')
+    local attempts = tonumber(counts[1])
+    redis.call('ZREM', p .. ':leased:' .. queue, ARGV[2])
+    redis.call('HINCRBY', p .. ':stats', queue .. '|leased', -1)
+    redis.call('HSET', job, 'last_error', ARGV[4], 'leased_by', '', 'updated_at', now)
+    if attempts >= tonumber(counts[2]) then
+        redis.call('HSET', job, 'status', 'dead')
+        redis.call('ZADD', p .. ':dead', now, ARGV[2])
+        redis.call('HINCRBY', p .. ':stats', queue .. '|dead', 1)
+    else
+        -- Backoff exponencial a cada tentativa
+        redis.call('HSET', job, 'status', 'pending')
+        redis.call('ZADD', p .. ':ready:' .. queue, now + tonumber(ARGV[5]) * 2 ^ (attempts - 1), ARGV[2])
+        redis.call('HINCRBY', p .. ':stats', queue .. '|pending', 1)
+    end
+    return 1
+    """
+
+    def __init__(self, url="redis://localhost:6379/0", prefix="shorts"):
+        import redis
+
+        self.url = url
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self._scripts = {
+            name: self.client.register_script(getattr(self, name))
+            for name in ('ENQUEUE', 'LEASE', 'HEARTBEAT', 'CHECKPOINT', 'COMPLETE', 'FAIL')
+        }
+
+    def _run(self, name, *args):
+        return self._scripts[name](args=[self.prefix, *args])
+
+    def enqueue(self, queue, payload, max_attempts=5, delay=0, key=None):
+        return int(self._run('ENQUEUE', queue, json.dumps(payload, ensure_ascii=False),
+                             max_attempts, delay, key or ''))
+
+    def find(self, key):
+        job_id = self.client.hget(f"{self.prefix}:keys", key)
+        return int(job_id) if job_id else None
+
+    def lease(self, queue, worker_id, lease_seconds=300):
+        row = self._run('LEASE', queue, worker_id, lease_seconds)
+        if not row:
+            return None
+        job_id, payload, attempts, max_attempts, progress = row
+        return Job(int(job_id), queue, json.loads(payload), int(attempts), int(max_attempts),
+                   json.loads(progress) if progress else None)
+
+    def heartbeat(self, job, worker_id, lease_seconds=300):
+        return self._run('HEARTBEAT', job.id, worker_id, lease_seconds) == 1
+
+    def checkpoint(self, job, worker_id, progress):
+        if self._run('CHECKPOINT', job.id, worker_id, json.dumps(progress, ensure_ascii=False)) != 1:
+            return False
+        job.progress = progress
+        return True
+
+    def complete(self, job, worker_id, result=None):
+        return self._run('COMPLETE', job.id, worker_id, json.dumps(result, ensure_ascii=False)) == 1
+
+    def fail(self, job, worker_id, error, retry_delay=30):
+        return self._run('FAIL', job.id, worker_id, str(error), retry_delay) == 1
+
+    def stats(self):
+        stats = {}
+        for field, count in sorted(self.client.hgetall(f"{self.prefix}:stats").items()):
+            queue, status = field.rsplit('|', 1)
+            if int(count):
+                stats.setdefault(queue, {})[status] = int(count)
+        return stats
+
+    def dead_jobs(self, queue=None):
+        jobs = []
+        for job_id in sorted(self.client.zrange(f"{self.prefix}:dead", 0, -1), key=int):
+            q, payload, attempts, error = self.client.hmget(
+                f"{self.prefix}:job:{job_id}", 'queue', 'payload', 'attempts', 'last_error'
+            )
+            if queue and q != queue:
+                continue
+            jobs.append({'id': int(job_id), 'queue': q, 'payload': json.loads(payload),
+                         'attempts': int(attempts), 'error': error})
+        return jobs
+
+def open_queue(location):
+    """Abre a fila pela URL: redis://... usa o Redis; qualquer outro valor é um arquivo SQLite"""
+    if location.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisQueue(location)
+    return SQLiteQueue(location)
+
+def default_worker_id():
+    """Identificador do worker: máquina + processo"""
+    return f"{socket.gethostname()}:{os.getpid()}"
@@ -0,0 +1,341 @@
+"""Modo distribuído: workers de crawl, análise e upload ligados por uma fila durável
+
+As filas ficam no Redis (work_queue.RedisQueue), para workers em várias
+máquinas, ou em um arquivo SQLite (work_queue.SQLiteQueue) quando tudo roda em
+um computador. Os vídeos passam entre os workers por um armazenamento
+compartilhado (artifacts.py): uma pasta montada em todas as máquinas ou um
+bucket S3; os jobs levam só a chave do vídeo.
+
+Uso:
+    python worker.py --queue redis://fila:6379/0 --artifacts s3://bucket/videos enqueue https://www.temu.com/... --channel canal1
+    python worker.py --queue redis://fila:6379/0 --artifacts s3://bucket/videos crawl
+    python worker.py --queue redis://fila:6379/0 --artifacts s3://bucket/videos analyze
+    python worker.py --queue redis://fila:6379/0 --artifacts s3://bucket/videos upload --channel canal1
+    python worker.py --queue redis://fila:6379/0 status
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from artifacts import open_artifact_store
+from metrics import registry, get_logger, log_event
+from work_queue import open_queue, default_worker_id
+
+logger = get_logger("worker")
+
+class LeaseLost(RuntimeError):
+    """O lease do job expirou e ele pode já estar com outro worker"""
+
+class Heartbeat:
+    """Renova o lease de um job em segundo plano enquanto ele é processado"""
+
+    def __init__(self, queue, job, worker_id, lease_seconds):
+        self.queue = queue
+        self.job = job
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                if not self.queue.heartbeat(self.job, self.worker_id, self.lease_seconds):
+                    self.lost = True
+                    log_event(logger, "Lease do job perdido", level=logging.WARNING, job=self.job.id)
+                    return
+            except Exception as e:
+                log_event(logger, "Erro no heartbeat", level=logging.WARNING, job=self.job.id, error=str(e))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+class Worker:
+    """Loop básico: pega um job, processa com heartbeat e registra o resultado"""
+
+    queue_name = None
+
+    def __init__(self, queue, worker_id=None, lease_seconds=300, poll_interval=5, retry_delay=30):
+        self.queue = queue
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.job_interval = 0  # pausa depois de cada job (ex.: entre uploads)
+        self._heartbeat = None
+
+    def handle(self, job):
+        raise NotImplementedError
+
+    def check_lease(self):
+        """Interrompe o job se o lease foi perdido, antes de criar jobs seguintes"""
+        if self._heartbeat is not None and self._heartbeat.lost:
+            raise LeaseLost(f"Lease do job {self._heartbeat.job.id} perdido")
+
+    def close(self):
+        pass
+
+    def run_once(self):
+        """Processa um job; retorna False se a fila estava vazia"""
+        job = self.queue.lease(self.queue_name, self.worker_id, self.lease_seconds)
+        if job is None:
+            return False
+
+        log_event(logger, f"Processando job {job.id}", queue=self.queue_name,
+                  attempt=job.attempts, worker=self.worker_id)
+        try:
+            with Heartbeat(self.queue, job, self.worker_id, self.lease_seconds) as heartbeat:
+                self._heartbeat = heartbeat
+                with registry.timer("job", queue=self.queue_name):
+                    result = self.handle(job)
+        except Exception as e:
+            registry.inc("jobs_failed", queue=self.queue_name)
+            log_event(logger, "✗ Job falhou", level=logging.WARNING, job=job.id,
+                      queue=self.queue_name, attempt=job.attempts, error=str(e))
+            self.queue.fail(job, self.worker_id, str(e), self.retry_delay)
+        else:
+            registry.inc("jobs_completed", queue=self.queue_name)
+            if not self.queue.complete(job, self.worker_id, result):
+                log_event(logger, "Job concluído, mas o lease já tinha expirado", level=logging.WARNING,
+                          job=job.id, queue=self.queue_name)
+        finally:
+            self._heartbeat = None
+        return True
+
+    def run(self, once=False):
+        """Roda até ser interrompido (ou até a fila esvaziar, com once=True)"""
+        log_event(logger, "Worker aguardando jobs", worker=self.worker_id, queue=self.queue_name)
+        try:
+            while True:
+                if not self.run_once():
+                    if once:
+                        break
+                    time.sleep(self.poll_interval)
+                elif self.job_interval:
+                    # Fora do lease: o job já foi concluído
+                    time.sleep(self.job_interval)
+        except KeyboardInterrupt:
+            log_event(logger, "Worker interrompido", worker=self.worker_id, queue=self.queue_name)
+        finally:
+            self.close()
+
+class CrawlWorker(Worker):
+    """Abre a página, baixa os vídeos e cria os jobs de análise"""
+
+    queue_name = "crawl"
+
+    def __init__(self, queue, api_key, artifacts, work_folder=None, **kwargs):
+        super().__init__(queue, **kwargs)
+        from temu_video_extractor import VideoExtractor
+
+        self.extractor = VideoExtractor(api_key)
+        self.artifacts = artifacts
+        # Os downloads ficam aqui só até irem para o armazenamento compartilhado
+        self.work_folder = work_folder or tempfile.mkdtemp(prefix="crawl_")
+        self.driver = None
+
+    def handle(self, job):
+        url = job.payload['url']
+        channels = job.payload.get('channels', [])
+        job_folder = f"job_{job.id}"
+        local_folder = os.path.join(self.work_folder, job_folder)
+        os.makedirs(local_folder, exist_ok=True)
+
+        # O navegador é reaproveitado entre jobs
+        if self.driver is None:
+            self.driver = self.extractor.setup_driver()
+
+        try:
+            self.extractor.network_urls = set()
+            # Ordenadas: a ordem do set muda a cada processo (hash seed) e os
+            # índices dos arquivos precisam ser os mesmos em uma nova tentativa
+            urls = sorted(self.extractor.collect_video_urls(self.driver, url))
+        except Exception:
+            self.close()
+            raise
+
+        # Duplicados são descartados só dentro da mesma página: outro job da
+        # mesma URL (ex.: para outro canal) precisa dos próprios vídeos
+        self.extractor.content_hashes = {}
+
+        queued = 0
+        for i, video_url in enumerate(urls, 1):
+            # Em uma nova tentativa, não baixa de novo (nem sobrescreve) o que já foi enfileirado
+            key = f"crawl:{job.id}:{hashlib.sha1(video_url.encode('utf-8')).hexdigest()}"
+            if self.queue.find(key) is not None:
+                queued += 1
+                continue
+
+            video_path = self.extractor.download_and_analyze_video(video_url, local_folder, i, analyze=False)
+            if video_path:
+                self.check_lease()
+                video = self.artifacts.put(video_path, f"{job_folder}/{os.path.basename(video_path)}")
+                self.queue.enqueue("analyze", {
+                    'video': video,
+                    'index': i,
+                    'channels': channels
+                }, key=key)
+                queued += 1
+
+        return {'videos_found': len(urls), 'analysis_jobs': queued}
+
+    def close(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+class AnalyzeWorker(Worker):
+    """Gera o título com o Gemini, renomeia o vídeo e cria os jobs de upload"""
+
+    queue_name = "analyze"
+
+    def __init__(self, queue, api_key, artifacts, analysis_mode="frames", **kwargs):
+        super().__init__(queue, **kwargs)
+        from temu_video_extractor import VideoAnalyzer
+
+        self.analyzer = VideoAnalyzer(api_key, analysis_mode=analysis_mode)
+        self.artifacts = artifacts
+
+    def handle(self, job):
+        from temu_video_extractor import VideoExtractor
+
+        video = job.payload['video']
+        index = job.payload['index']
+
+        # O título é salvo antes de renomear: uma nova tentativa depois da
+        # renomeação não encontraria mais o arquivo temporário
+        title = job.progress.get('title')
+        if title is None:
+            local_path = self.artifacts.fetch(video)
+            try:
+                title = self.analyzer.analyze_file(local_path)
+            finally:
+                self.artifacts.release(video, local_path)
+            if not title and job.attempts < job.max_attempts:
+                # Provavelmente limite do Gemini (429): tenta de novo mais tarde
+                raise RuntimeError("Gemini não retornou título")
+            title = title or f"Produto Temu {index}"
+
+            self.check_lease()
+            if not self.queue.checkpoint(job, self.worker_id, {'title': title}):
+                raise LeaseLost(f"Lease do job {job.id} perdido")
+
+        name = VideoExtractor.final_filename(index, title)
+        folder = video.rpartition('/')[0]
+        final = f"{folder}/{name}" if folder else name
+        if self.artifacts.exists(video):
+            self.artifacts.move(video, final)
+            registry.inc("videos_processed")
+            log_event(logger, "✓ Vídeo analisado", index=index, video=final, title=title)
+        elif not self.artifacts.exists(final):
+            raise FileNotFoundError(f"Vídeo não encontrado: {video}")
+
+        self.check_lease()
+        for channel in job.payload.get('channels', []):
+            self.queue.enqueue(f"upload:{channel}", {'video': final, 'title': title},
+                               key=f"analyze:{job.id}:{channel}")
+
+        return {'video': final, 'title': title}
+
+class UploadWorker(Worker):
+    """Envia os vídeos de um canal para o YouTube"""
+
+    def __init__(self, queue, client_secrets_file, channel_name, artifacts, delay_seconds=60, **kwargs):
+        super().__init__(queue, **kwargs)
+        from youtube_shorts_uploader import YouTubeShortsUploader
+
+        self.queue_name = f"upload:{channel_name}"
+        self.artifacts = artifacts
+        # Intervalo entre uploads, como em upload_directory
+        self.job_interval = delay_seconds
+        self.uploader = YouTubeShortsUploader(client_secrets_file, channel_name, interactive=False)
+        self.uploader.authenticate()
+
+    def handle(self, job):
+        video = job.payload['video']
+        local_path = self.artifacts.fetch(video)
+        try:
+            # O upload não pode ser desfeito: não envia se outro worker pode ter pego o job
+            self.check_lease()
+            video_id = self.uploader.upload_video(local_path, job.payload.get('title'))
+        finally:
+            self.artifacts.release(video, local_path)
+        if not video_id:
+            raise RuntimeError("Upload falhou")
+
+        return {'video_id': video_id, 'url': f'https://youtube.com/shorts/{video_id}'}
+
+def main():
+    parser = argparse.ArgumentParser(description="Workers do modo distribuído")
+    parser.add_argument('--queue', '--db', dest='queue', default="jobs.db",
+                        help="redis://host:6379/0 (várias máquinas) ou arquivo SQLite (uma máquina)")
+    parser.add_argument('--artifacts', default="videos_temu",
+                        help="Onde ficam os vídeos: pasta compartilhada por todas as máquinas ou s3://bucket/prefixo")
+    parser.add_argument('--worker-id', help="Identificador do worker (padrão: máquina:pid)")
+    parser.add_argument('--lease', type=int, default=300, help="Duração do lease em segundos")
+    parser.add_argument('--once', action='store_true', help="Sai quando a fila esvaziar")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = subparsers.add_parser('enqueue', help="Adiciona páginas do Temu à fila de crawl")
+    enqueue.add_argument('urls', nargs='+')
+    enqueue.add_argument('--channel', action='append', default=[], help="Canal de destino (pode repetir)")
+
+    crawl = subparsers.add_parser('crawl', help="Worker de crawl e download")
+    crawl.add_argument('--work-dir', help="Pasta local para os downloads (padrão: temporária)")
+
+    analyze = subparsers.add_parser('analyze', help="Worker de análise com o Gemini")
+    analyze.add_argument('--analysis-mode', choices=['frames', 'contact_sheet'], default='frames')
+
+    upload = subparsers.add_parser('upload', help="Worker de upload de um canal")
+    upload.add_argument('--channel', required=True)
+    upload.add_argument('--client-secrets', default="client_secrets.json")
+    upload.add_argument('--delay', type=int, default=60, help="Segundos entre uploads")
+
+    subparsers.add_parser('status', help="Mostra os jobs por fila e status")
+
+    args = parser.parse_args()
+    queue = open_queue(args.queue)
+    api_key = os.environ.get("GEMINI_API_KEY", "")
+    options = {'worker_id': args.worker_id, 'lease_seconds': args.lease}
+
+    if args.command == 'enqueue':
+        for url in args.urls:
+            job_id = queue.enqueue("crawl", {'url': url, 'channels': args.channel})
+            print(f"Job {job_id} criado para {url}")
+    elif args.command == 'status':
+        print(json.dumps({'queues': queue.stats(), 'dead': queue.dead_jobs()}, ensure_ascii=False, indent=2))
+    else:
+        artifacts = open_artifact_store(args.artifacts)
+        if args.command == 'crawl':
+            worker = CrawlWorker(queue, api_key, artifacts, work_folder=args.work_dir, **options)
+        elif args.command == 'analyze':
+            worker = AnalyzeWorker(queue, api_key, artifacts, analysis_mode=args.analysis_mode, **options)
+        else:
+            from youtube_shorts_uploader import AuthorizationRequired
+
+            try:
+                worker = UploadWorker(queue, args.client_secrets, args.channel, artifacts,
+                                      delay_seconds=args.delay, **options)
+            except AuthorizationRequired as e:
+                log_event(logger, "Canal sem autorização", level=logging.ERROR, channel=args.channel, error=str(e))
+                sys.exit(1)
+        worker.run(once=args.once)
+        registry.export(f"metrics_worker_{args.command}")
+
+if __name__ == "__main__":
+    main()
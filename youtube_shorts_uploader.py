@@ -1,93 +1,359 @@
 import os
 import pickle
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
-from googleapiclient.errors import HttpError
+import tempfile
+import threading
 import json
+import logging
 import random
 import time
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from metrics import registry, get_logger, log_event, THROUGHPUT_BUCKETS
+
+logger = get_logger("youtube_shorts_uploader")
+
+class AuthorizationRequired(RuntimeError):
+    """O canal precisa de autorização pelo navegador, mas o modo é não interativo"""
+
+class CredentialManager:
+    """Gerencia credenciais e clientes da API compartilhados entre canais"""
+
+    def __init__(self, client_secrets_file, scopes, refresh_margin=300, channel_info_ttl=600):
+        self.client_secrets_file = client_secrets_file
+        self.scopes = list(scopes)
+        self.api_name = "youtube"
+        self.api_version = "v3"
+        self.refresh_margin = refresh_margin  # segundos antes de expirar para renovar
+        self.channel_info_ttl = channel_info_ttl
+        # _lock só protege os dicionários; login e refresh (rede) usam o lock
+        # do canal, para um canal lento não travar os outros
+        self._lock = threading.Lock()
+        self._channel_locks = {}
+        self._credentials = {}
+        self._services = {}
+        self._channel_info = {}  # canal -> (timestamp, info)
+        self._refresh_thread = None
+        self._stop_refresh = threading.Event()
+
+    @staticmethod
+    def token_file(channel_name):
+        """Arquivo de token (JSON) do canal"""
+        return f'token_{channel_name}.json'
+
+    @staticmethod
+    def legacy_token_file(channel_name):
+        """Arquivo de token antigo (pickle) do canal"""
+        return f'token_{channel_name}.pickle'
+
+    @staticmethod
+    def list_channels(directory='.'):
+        """Lista os canais que possuem token salvo"""
+        channels = []
+        for f in sorted(os.listdir(directory)):
+            if not f.startswith('token_'):
+                continue
+            if f.endswith('.json'):
+                name = f[6:-5]  # Remove 'token_' e '.json'
+            elif f.endswith('.pickle'):
+                name = f[6:-7]  # Remove 'token_' e '.pickle'
+            else:
+                continue
+            if name not in channels:
+                channels.append(name)
+        return channels
+
+    def _save_credentials(self, channel_name, credentials):
+        """Salva as credenciais em JSON de forma atômica"""
+        token_file = self.token_file(channel_name)
+        # Arquivo temporário exclusivo: vários processos podem renovar o mesmo canal
+        fd, temp_file = tempfile.mkstemp(
+            prefix=os.path.basename(token_file) + '.',
+            suffix='.tmp',
+            dir=os.path.dirname(os.path.abspath(token_file))
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(credentials.to_json())
+            os.replace(temp_file, token_file)
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+
+    def _load_credentials(self, channel_name):
+        """Carrega credenciais do disco, migrando tokens pickle antigos"""
+        token_file = self.token_file(channel_name)
+        if os.path.exists(token_file):
+            from google.oauth2.credentials import Credentials
+            
+            # Usa os escopos gravados no token para não pedir escopos não concedidos no refresh
+            return Credentials.from_authorized_user_file(token_file)
+
+        legacy_file = self.legacy_token_file(channel_name)
+        if os.path.exists(legacy_file):
+            with open(legacy_file, 'rb') as token:
+                credentials = pickle.load(token)
+            self._save_credentials(channel_name, credentials)
+            os.remove(legacy_file)
+            log_event(logger, "Token migrado para JSON", channel=channel_name, token_file=token_file)
+            return credentials
+
+        return None
+
+    def _login(self):
+        """Faz login pelo navegador"""
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        
+        flow = InstalledAppFlow.from_client_secrets_file(
+            self.client_secrets_file,
+            self.scopes,
+            redirect_uri='http://localhost:8080'
+        )
+        return flow.run_local_server(
+            port=8080,
+            prompt='consent',
+            access_type='offline'
+        )
+
+    def _channel_lock(self, channel_name):
+        """Lock do canal, criado na primeira vez"""
+        with self._lock:
+            lock = self._channel_locks.get(channel_name)
+            if lock is None:
+                lock = self._channel_locks[channel_name] = threading.RLock()
+            return lock
+
+    def _needs_refresh(self, credentials):
+        """Verifica se o token expira dentro da margem configurada"""
+        if not credentials.refresh_token:
+            return False
+        if not credentials.valid or credentials.expiry is None:
+            return True
+        # google-auth usa datetimes UTC sem timezone
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return credentials.expiry - now < timedelta(seconds=self.refresh_margin)
+
+    def get_credentials(self, channel_name, interactive=True):
+        """Retorna credenciais válidas do canal, usando o cache em memória
+
+        Com interactive=False, levanta AuthorizationRequired em vez de abrir o
+        login pelo navegador (que esperaria para sempre em cron ou em um worker).
+        """
+        with self._channel_lock(channel_name):
+            with self._lock:
+                credentials = self._credentials.get(channel_name)
+            if credentials is None:
+                credentials = self._load_credentials(channel_name)
+
+            # Tokens antigos podem ter só youtube.upload: pede novo consentimento
+            if credentials and not credentials.has_scopes(self.scopes):
+                log_event(logger, "Token sem todos os escopos necessários, nova autorização será pedida",
+                          level=logging.WARNING, channel=channel_name, scopes=' '.join(self.scopes))
+                credentials = None
+
+            if credentials and self._needs_refresh(credentials):
+                from google.auth.exceptions import RefreshError, TransportError
+                from google.auth.transport.requests import Request
+                
+                try:
+                    credentials.refresh(Request())
+                    self._save_credentials(channel_name, credentials)
+                except RefreshError as e:
+                    # Refresh token revogado ou expirado: só um novo login resolve
+                    log_event(logger, "Não foi possível renovar o token, nova autorização será pedida",
+                              level=logging.WARNING, channel=channel_name, error=str(e))
+                    credentials = None
+                except TransportError as e:
+                    if not interactive:
+                        raise AuthorizationRequired(
+                            f"Não foi possível renovar o token do canal '{channel_name}': {e}"
+                        ) from e
+                    raise
+
+            if not credentials or not credentials.valid:
+                if not interactive:
+                    raise AuthorizationRequired(
+                        f"Canal '{channel_name}' sem token válido: autorize-o antes pelo "
+                        f"youtube_shorts_uploader.py (menu interativo)"
+                    )
+                credentials = self._login()
+                self._save_credentials(channel_name, credentials)
+                with self._lock:
+                    self._services.pop(channel_name, None)
+
+            with self._lock:
+                self._credentials[channel_name] = credentials
+            return credentials
+
+    def get_service(self, channel_name, interactive=True):
+        """Retorna o cliente da API do canal, construindo-o apenas uma vez"""
+        with self._channel_lock(channel_name):
+            credentials = self.get_credentials(channel_name, interactive=interactive)
+            with self._lock:
+                service = self._services.get(channel_name)
+            if service is None:
+                from googleapiclient.discovery import build
+                
+                service = build(
+                    self.api_name,
+                    self.api_version,
+                    credentials=credentials,
+                    cache_discovery=False
+                )
+                with self._lock:
+                    self._services[channel_name] = service
+            return service
+
+    def invalidate(self, channel_name, remove_token=False):
+        """Descarta credenciais, cliente e cache do canal"""
+        with self._channel_lock(channel_name):
+            with self._lock:
+                self._credentials.pop(channel_name, None)
+                self._services.pop(channel_name, None)
+                self._channel_info.pop(channel_name, None)
+            if remove_token:
+                for token_file in (self.token_file(channel_name), self.legacy_token_file(channel_name)):
+                    if os.path.exists(token_file):
+                        os.remove(token_file)
+                        log_event(logger, "Token removido", channel=channel_name, token_file=token_file)
+
+    def get_channel_info(self, channel_name, force=False, interactive=True):
+        """Obtém informações do canal, com cache por channel_info_ttl segundos"""
+        with self._lock:
+            cached = self._channel_info.get(channel_name)
+            if cached and not force and time.time() - cached[0] < self.channel_info_ttl:
+                return cached[1]
+
+        youtube = self.get_service(channel_name, interactive=interactive)
+        response = youtube.channels().list(
+            part="snippet,statistics",
+            mine=True
+        ).execute()
+
+        info = None
+        if response.get('items'):
+            channel = response['items'][0]
+            info = {
+                'title': channel['snippet']['title'],
+                'id': channel['id'],
+                'videos': channel['statistics']['videoCount']
+            }
+
+        with self._lock:
+            self._channel_info[channel_name] = (time.time(), info)
+        return info
+
+    def refresh_expiring(self):
+        """Renova os tokens em cache que estão perto de expirar"""
+        from google.auth.transport.requests import Request
+        
+        with self._lock:
+            channels = list(self._credentials)
+
+        for channel_name in channels:
+            try:
+                # Só o canal sendo renovado espera pela rede
+                with self._channel_lock(channel_name):
+                    with self._lock:
+                        credentials = self._credentials.get(channel_name)
+                    if credentials and self._needs_refresh(credentials):
+                        credentials.refresh(Request())
+                        self._save_credentials(channel_name, credentials)
+            except Exception as e:
+                log_event(logger, "Erro ao renovar token", level=logging.ERROR, channel=channel_name, error=str(e))
+
+    def start_background_refresh(self, interval=60):
+        """Inicia uma thread que renova os tokens antes de expirarem"""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+
+        self._stop_refresh.clear()
+
+        def run():
+            while not self._stop_refresh.wait(interval):
+                self.refresh_expiring()
+
+        self._refresh_thread = threading.Thread(
+            target=run,
+            name="youtube-token-refresh",
+            daemon=True
+        )
+        self._refresh_thread.start()
+
+    def stop_background_refresh(self):
+        """Para a thread de renovação de tokens"""
+        self._stop_refresh.set()
+        if self._refresh_thread:
+            self._refresh_thread.join()
+            self._refresh_thread = None
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+def get_credential_manager(client_secrets_file, scopes):
+    """Retorna o CredentialManager compartilhado para o arquivo de credenciais"""
+    key = (os.path.abspath(client_secrets_file), tuple(scopes))
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = CredentialManager(client_secrets_file, scopes)
+            manager.start_background_refresh()
+            _managers[key] = manager
+        return manager
 
 class YouTubeShortsUploader:
-    def __init__(self, client_secrets_file, channel_name="default"):
+    def __init__(self, client_secrets_file, channel_name="default", manager=None, interactive=True):
         self.client_secrets_file = client_secrets_file
         self.channel_name = channel_name
+        # False para cron/workers: sem token válido, falha em vez de abrir o navegador
+        self.interactive = interactive
         self.api_name = "youtube"
         self.api_version = "v3"
-        self.scopes = ["https://www.googleapis.com/auth/youtube.upload"]
+        self.scopes = [
+            "https://www.googleapis.com/auth/youtube.upload",
+            "https://www.googleapis.com/auth/youtube"  # Necessário para operações em lote
+        ]
+        # Cota diária da API e custo estimado de cada operação
+        self.daily_quota = 10000
+        self.quota_used = 0
+        self.quota_costs = {
+            'videos.insert': 1600,
+            'videos.update': 50,
+            'playlistItems.insert': 50
+        }
+        self.batch_size = 50
+        self.manager = manager or get_credential_manager(client_secrets_file, self.scopes)
         self.credentials = None
         self.youtube = None
-        self.token_file = f'token_{channel_name}.pickle'
+        self.token_file = self.manager.token_file(channel_name)
     
     def force_new_authentication(self):
         """Força uma nova autenticação removendo o token existente"""
-        if os.path.exists(self.token_file):
-            os.remove(self.token_file)
-            print(f"Token removido para o canal {self.channel_name}")
+        self.manager.invalidate(self.channel_name, remove_token=True)
         self.credentials = None
         self.youtube = None
     
-    def get_channel_info(self):
+    def get_channel_info(self, force=False):
         """Obtém informações do canal atual"""
         try:
-            response = self.youtube.channels().list(
-                part="snippet,statistics",
-                mine=True
-            ).execute()
-            
-            if response['items']:
-                channel = response['items'][0]
-                return {
-                    'title': channel['snippet']['title'],
-                    'id': channel['id'],
-                    'videos': channel['statistics']['videoCount']
-                }
+            return self.manager.get_channel_info(self.channel_name, force=force, interactive=self.interactive)
         except Exception as e:
-            print(f"Erro ao obter informações do canal: {str(e)}")
+            log_event(logger, "Erro ao obter informações do canal", level=logging.ERROR,
+                      channel=self.channel_name, error=str(e))
         return None
 
-    def authenticate(self):
+    def authenticate(self, show_channel_info=False):
         """Autenticação com o YouTube"""
-        # Verifica se já temos credenciais salvas
-        if os.path.exists(self.token_file):
-            with open(self.token_file, 'rb') as token:
-                self.credentials = pickle.load(token)
-        
-        # Se não há credenciais válidas, faz login
-        if not self.credentials or not self.credentials.valid:
-            if self.credentials and self.credentials.expired and self.credentials.refresh_token:
-                self.credentials.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    self.client_secrets_file, 
-                    self.scopes,
-                    redirect_uri='http://localhost:8080'
-                )
-                self.credentials = flow.run_local_server(
-                    port=8080,
-                    prompt='consent',
-                    access_type='offline'
-                )
-            
-            # Salva as credenciais para o próximo uso
-            with open(self.token_file, 'wb') as token:
-                pickle.dump(self.credentials, token)
+        # Credenciais e cliente vêm do cache compartilhado do manager
+        self.credentials = self.manager.get_credentials(self.channel_name, interactive=self.interactive)
+        self.youtube = self.manager.get_service(self.channel_name, interactive=self.interactive)
         
-        self.youtube = build(
-            self.api_name, 
-            self.api_version, 
-            credentials=self.credentials,
-            cache_discovery=False
-        )
-        
-        # Mostra informações do canal
-        channel_info = self.get_channel_info()
-        if channel_info:
-            print(f"\nConectado ao canal: {channel_info['title']}")
-            print(f"ID do canal: {channel_info['id']}")
-            print(f"Total de vídeos: {channel_info['videos']}")
+        # Informações do canal só são buscadas quando pedidas
+        if show_channel_info:
+            channel_info = self.get_channel_info()
+            if channel_info:
+                log_event(logger, "Conectado ao canal", channel=self.channel_name,
+                          title=channel_info['title'], channel_id=channel_info['id'],
+                          videos=channel_info['videos'])
 
     def generate_description(self, title):
         """Gera uma descrição para o vídeo"""
@@ -121,6 +387,9 @@ class YouTubeShortsUploader:
     
     def upload_video(self, video_path, title=None):
         """Faz upload de um vídeo como Short"""
+        from googleapiclient.http import MediaFileUpload
+        from googleapiclient.errors import HttpError
+        
         try:
             if not os.path.exists(video_path):
                 raise FileNotFoundError(f"Vídeo não encontrado: {video_path}")
@@ -158,7 +427,7 @@ class YouTubeShortsUploader:
             )
             
             # Faz o upload
-            print(f"\nIniciando upload de: {title}")
+            log_event(logger, "Iniciando upload", channel=self.channel_name, video_path=video_path, title=title)
             request = self.youtube.videos().insert(
                 part=','.join(body.keys()),
                 body=body,
@@ -166,13 +435,31 @@ class YouTubeShortsUploader:
             )
             
             response = None
-            while response is None:
-                status, response = request.next_chunk()
-                if status:
-                    print(f"Upload {int(status.progress() * 100)}% completo...")
+            sent_bytes = 0
+            with registry.timer("upload_video"):
+                while response is None:
+                    chunk_start = time.perf_counter()
+                    status, response = request.next_chunk()
+                    elapsed = time.perf_counter() - chunk_start
+                    
+                    # Bytes enviados neste chunk
+                    total_sent = status.resumable_progress if status else os.path.getsize(video_path)
+                    chunk_bytes = total_sent - sent_bytes
+                    sent_bytes = total_sent
+                    if elapsed > 0 and chunk_bytes > 0:
+                        registry.observe("upload_chunk_bytes_per_second", chunk_bytes / elapsed,
+                                         buckets=THROUGHPUT_BUCKETS)
+                    registry.inc("upload_bytes", chunk_bytes)
+                    
+                    if status:
+                        log_event(logger, "Upload em andamento", video_path=video_path,
+                                  progress=int(status.progress() * 100),
+                                  bytes=sent_bytes, chunk_seconds=round(elapsed, 3))
             
+            self.quota_used += self.quota_costs['videos.insert']
+            registry.inc("videos_uploaded", channel=self.channel_name)
             video_id = response['id']
-            print(f"Upload concluído! ID do vídeo: {video_id}")
+            log_event(logger, "Upload concluído", channel=self.channel_name, video_path=video_path, video_id=video_id)
             
             # Registra o upload
             self._log_upload(video_path, video_id, title)
@@ -180,10 +467,14 @@ class YouTubeShortsUploader:
             return video_id
             
         except HttpError as e:
-            print(f"Erro no upload: {str(e)}")
+            registry.inc("upload_errors", channel=self.channel_name)
+            log_event(logger, "Erro no upload", level=logging.ERROR, channel=self.channel_name,
+                      video_path=video_path, error=str(e))
             return None
         except Exception as e:
-            print(f"Erro inesperado: {str(e)}")
+            registry.inc("upload_errors", channel=self.channel_name)
+            log_event(logger, "Erro inesperado no upload", level=logging.ERROR, channel=self.channel_name,
+                      video_path=video_path, error=str(e))
             return None
     
     def _log_upload(self, video_path, video_id, title):
@@ -215,17 +506,18 @@ class YouTubeShortsUploader:
     def upload_directory(self, directory_path, delay_minutes=1):
         """Faz upload de todos os vídeos em um diretório"""
         if not os.path.exists(directory_path):
-            print(f"Diretório não encontrado: {directory_path}")
+            log_event(logger, "Diretório não encontrado", level=logging.ERROR, directory=directory_path)
             return
         
         # Lista todos os vídeos MP4
         videos = [f for f in os.listdir(directory_path) if f.endswith('.mp4')]
         
         if not videos:
-            print("Nenhum vídeo encontrado no diretório.")
+            log_event(logger, "Nenhum vídeo encontrado no diretório", level=logging.WARNING, directory=directory_path)
             return
         
-        print(f"Encontrados {len(videos)} vídeos para upload.")
+        log_event(logger, "Vídeos encontrados para upload", videos=len(videos), directory=directory_path)
+        uploaded_ids = []
         
         # Faz upload de cada vídeo
         for i, video in enumerate(videos, 1):
@@ -236,7 +528,7 @@ class YouTubeShortsUploader:
             if title.startswith(('video_', 'temp_')):
                 title = ' '.join(title.split('_')[1:])
             
-            print(f"\nProcessando vídeo {i}/{len(videos)}: {title}")
+            log_event(logger, "Processando vídeo", index=i, total=len(videos), title=title)
             
             # Tenta fazer o upload com retry em caso de erro
             max_retries = 3
@@ -247,28 +539,178 @@ class YouTubeShortsUploader:
                 try:
                     video_id = self.upload_video(video_path, title)
                     if video_id:
-                        print(f"Upload bem sucedido após {retry_count + 1} tentativa(s)")
+                        log_event(logger, "Upload bem sucedido", video_id=video_id, attempts=retry_count + 1)
                     else:
                         raise Exception("Upload falhou")
                 except Exception as e:
                     retry_count += 1
                     if retry_count < max_retries:
                         wait_time = retry_count * 30  # Aumenta o tempo de espera a cada retry
-                        print(f"Tentativa {retry_count} falhou. Aguardando {wait_time} segundos...")
+                        log_event(logger, "Tentativa de upload falhou", level=logging.WARNING, video_path=video_path,
+                                  attempt=retry_count, wait_seconds=wait_time)
                         time.sleep(wait_time)
                     else:
-                        print(f"Todas as tentativas falharam para o vídeo: {title}")
-                        print(f"Erro: {str(e)}")
+                        log_event(logger, "Todas as tentativas de upload falharam", level=logging.ERROR,
+                                  video_path=video_path, title=title, error=str(e))
+            
+            if video_id:
+                uploaded_ids.append(video_id)
             
             # Aguarda entre uploads (apenas se não for o último vídeo)
             if i < len(videos) and video_id:
-                print(f"Aguardando {delay_minutes} minuto(s) até o próximo upload...")
+                log_event(logger, "Aguardando até o próximo upload", minutes=delay_minutes)
                 for remaining in range(delay_minutes * 60, 0, -1):
                     mins = remaining // 60
                     secs = remaining % 60
                     print(f"Próximo upload em: {mins:02d}:{secs:02d}", end='\r')
                     time.sleep(1)
-                print("\nIniciando próximo upload...")
+                logger.info("Iniciando próximo upload")
+        
+        return uploaded_ids
+    
+    def remaining_quota(self):
+        """Cota estimada restante para o dia"""
+        return max(self.daily_quota - self.quota_used, 0)
+    
+    @staticmethod
+    def _error_reason(error):
+        """Extrai o motivo (reason) de um HttpError da API"""
+        try:
+            content = json.loads(error.content.decode('utf-8'))
+            errors = content.get('error', {}).get('errors', [])
+            if errors:
+                return errors[0].get('reason')
+        except Exception:
+            pass
+        return None
+    
+    def _is_retryable(self, error):
+        """Verifica se o erro de um item do lote pode ser repetido"""
+        from googleapiclient.errors import HttpError
+        
+        if not isinstance(error, HttpError):
+            return False
+        status = error.resp.status
+        if status in (429, 500, 502, 503, 504):
+            return True
+        return status == 403 and self._error_reason(error) in ('rateLimitExceeded', 'userRateLimitExceeded')
+    
+    def execute_batch(self, operations, max_retries=3):
+        """Executa operações via batch HTTP, com retry por item e controle de cota
+        
+        operations: lista de (chave, nome_da_operação, função que cria a requisição)
+        Retorna um dict chave -> {'ok', 'response', 'error'}
+        """
+        results = {}
+        pending = list(operations)
+        attempt = 0
+        
+        while pending and attempt <= max_retries:
+            if attempt:
+                wait_time = 2 ** attempt
+                log_event(logger, "Repetindo operações em lote", level=logging.WARNING,
+                          operations=len(pending), wait_seconds=wait_time)
+                time.sleep(wait_time)
+            
+            # Só envia o que cabe na cota restante
+            remaining = self.remaining_quota()
+            to_send = []
+            for op in pending:
+                cost = self.quota_costs.get(op[1], 1)
+                if cost > remaining:
+                    results[op[0]] = {'ok': False, 'response': None, 'error': 'quota'}
+                    continue
+                remaining -= cost
+                to_send.append(op)
+            
+            retry = []
+            quota_exceeded = False
+            for start in range(0, len(to_send), self.batch_size):
+                chunk = {str(i): op for i, op in enumerate(to_send[start:start + self.batch_size])}
+                
+                def callback(request_id, response, exception, chunk=chunk):
+                    nonlocal quota_exceeded
+                    key, name, factory = chunk[request_id]
+                    if exception is None:
+                        self.quota_used += self.quota_costs.get(name, 1)
+                        results[key] = {'ok': True, 'response': response, 'error': None}
+                        return
+                    if self._error_reason(exception) in ('quotaExceeded', 'dailyLimitExceeded'):
+                        quota_exceeded = True
+                    if self._is_retryable(exception):
+                        # Respostas 429/5xx que serão repetidas não contam na cota
+                        retry.append(chunk[request_id])
+                    else:
+                        self.quota_used += self.quota_costs.get(name, 1)
+                    results[key] = {'ok': False, 'response': None, 'error': str(exception)}
+                
+                batch = self.youtube.new_batch_http_request(callback=callback)
+                for request_id, (key, name, factory) in chunk.items():
+                    batch.add(factory(), request_id=request_id)
+                
+                try:
+                    with registry.timer("batch_request"):
+                        batch.execute()
+                except Exception as e:
+                    # Falha no lote inteiro: todos os itens voltam para nova tentativa
+                    log_event(logger, "Erro no lote", level=logging.ERROR, operations=len(chunk), error=str(e))
+                    for op in chunk.values():
+                        if op[0] not in results or not results[op[0]]['ok']:
+                            results[op[0]] = {'ok': False, 'response': None, 'error': str(e)}
+                            if op not in retry:
+                                retry.append(op)
+                
+                if quota_exceeded:
+                    log_event(logger, "Cota da API esgotada, interrompendo operações em lote", level=logging.ERROR,
+                              quota_used=self.quota_used, daily_quota=self.daily_quota)
+                    self.quota_used = max(self.quota_used, self.daily_quota)
+                    # Operações não enviadas (ou que seriam repetidas) também entram no resultado
+                    for op in to_send[start + self.batch_size:] + retry:
+                        results[op[0]] = {'ok': False, 'response': None, 'error': 'quota'}
+                    return results
+            
+            pending = retry
+            attempt += 1
+        
+        ok = sum(1 for r in results.values() if r['ok'])
+        log_event(logger, "Operações em lote concluídas", ok=ok, total=len(results))
+        return results
+    
+    def publish_videos(self, video_ids, privacy_status='public', max_retries=3):
+        """Altera a privacidade de vários vídeos em lote"""
+        operations = [
+            (video_id, 'videos.update', lambda video_id=video_id: self.youtube.videos().update(
+                part='status',
+                body={
+                    'id': video_id,
+                    'status': {
+                        'privacyStatus': privacy_status,
+                        'selfDeclaredMadeForKids': False
+                    }
+                }
+            ))
+            for video_id in video_ids
+        ]
+        return self.execute_batch(operations, max_retries=max_retries)
+    
+    def add_to_playlist(self, playlist_id, video_ids, max_retries=3):
+        """Adiciona vários vídeos a uma playlist em lote"""
+        operations = [
+            (video_id, 'playlistItems.insert', lambda video_id=video_id: self.youtube.playlistItems().insert(
+                part='snippet',
+                body={
+                    'snippet': {
+                        'playlistId': playlist_id,
+                        'resourceId': {
+                            'kind': 'youtube#video',
+                            'videoId': video_id
+                        }
+                    }
+                }
+            ))
+            for video_id in video_ids
+        ]
+        return self.execute_batch(operations, max_retries=max_retries)
 
 def main():
     # Arquivo de credenciais do projeto Google Cloud
@@ -298,19 +740,18 @@ Para obter este arquivo:
         
         if choice == "1":
             # Lista os canais disponíveis
-            tokens = [f for f in os.listdir('.') if f.startswith('token_') and f.endswith('.pickle')]
-            if not tokens:
+            channels = CredentialManager.list_channels()
+            if not channels:
                 print("Nenhum canal configurado. Escolha a opção 2 para adicionar um canal.")
                 continue
             
             print("\nCanais disponíveis:")
-            for i, token in enumerate(tokens, 1):
-                channel_name = token[6:-7]  # Remove 'token_' e '.pickle'
+            for i, channel_name in enumerate(channels, 1):
                 print(f"{i}. {channel_name}")
             
             channel_idx = int(input("\nEscolha o canal: ")) - 1
-            if 0 <= channel_idx < len(tokens):
-                channel_name = tokens[channel_idx][6:-7]
+            if 0 <= channel_idx < len(channels):
+                channel_name = channels[channel_idx]
                 uploader = YouTubeShortsUploader(client_secrets_file, channel_name)
                 uploader.authenticate()
                 
@@ -320,35 +761,39 @@ Para obter este arquivo:
                     print(f"Diretório {videos_dir} não encontrado!")
                     continue
                 
-                uploader.upload_directory(videos_dir)
+                uploaded_ids = uploader.upload_directory(videos_dir)
+                
+                if uploaded_ids and input("\nPublicar os vídeos enviados agora? (s/n): ").lower() == 's':
+                    uploader.publish_videos(uploaded_ids)
             
         elif choice == "2":
             channel_name = input("Digite um nome para identificar o canal: ")
             uploader = YouTubeShortsUploader(client_secrets_file, channel_name)
             uploader.force_new_authentication()
-            uploader.authenticate()
+            uploader.authenticate(show_channel_info=True)
             print(f"\nCanal {channel_name} configurado com sucesso!")
             
         elif choice == "3":
-            tokens = [f for f in os.listdir('.') if f.startswith('token_') and f.endswith('.pickle')]
-            if not tokens:
+            channels = CredentialManager.list_channels()
+            if not channels:
                 print("Nenhum canal configurado.")
                 continue
             
             print("\nCanais disponíveis:")
-            for i, token in enumerate(tokens, 1):
-                channel_name = token[6:-7]
+            for i, channel_name in enumerate(channels, 1):
                 print(f"{i}. {channel_name}")
             
             channel_idx = int(input("\nEscolha o canal para reautenticar: ")) - 1
-            if 0 <= channel_idx < len(tokens):
-                channel_name = tokens[channel_idx][6:-7]
+            if 0 <= channel_idx < len(channels):
+                channel_name = channels[channel_idx]
                 uploader = YouTubeShortsUploader(client_secrets_file, channel_name)
                 uploader.force_new_authentication()
                 uploader.authenticate()
                 print(f"\nCanal {channel_name} reautenticado com sucesso!")
         
         elif choice == "4":
+            # Salva as métricas da sessão
+            registry.export("metrics_uploader")
             break
         
         else: